@@ -15,17 +15,92 @@ The CLI tool is designed to:
 """
 
 
+import argparse #import argparse to parse the options of the headless mode
+import cProfile #import cProfile to capture a profile of the slowest stage
+import bisect #import bisect to find the bin of a value in the pure Python histogram
 import csv #import csv module to process the csv file data
+import glob #import glob to expand file patterns in the headless mode
+import hashlib #import hashlib to name the cached columns after the file fingerprint
+import heapq #import heapq to merge sorted runs in the external sort
+import json #import json to save and reload streaming summaries
+import mmap #import mmap to map cached columns in memory instead of reading them
+import os #import os to fingerprint files and manage the column cache
+import random #import random to pick the items kept by the quantile sketch
+import struct #import struct to pack new values between slices of the stored sorted column
+import sys #import sys to return the exit status of the headless mode
+import tempfile #import tempfile to spill sorted runs of huge columns to disk
+import time #import time to measure the stages when profiling
+import tracemalloc #import tracemalloc to capture the allocations of the slowest stage
+from concurrent.futures import ProcessPoolExecutor #import the process pool to analyse columns in parallel
+from contextlib import contextmanager, redirect_stdout #import helpers to time stages and collect the output of files processed in parallel
+from io import BytesIO, StringIO, TextIOWrapper #import in memory streams for collected output and parsed chunks
+from array import array #import array to store spilled runs as packed floats
+from itertools import islice #import islice to preview the first rows of a streamed file
 from math import ceil #import ceil to use it in visualize function
 
-def open_file():
+try:
+    import numpy as np #optional, used for the vectorized columnar backend
+except ImportError:
+    np = None #fall back to pure Python arrays when NumPy is not installed
+
+try:
+    import resource #only available on Unix, used to report the peak resident memory of the process
+except ImportError:
+    resource = None
+
+EXTERNAL_SORT_THRESHOLD = 5_000_000 #columns with more values than this are sorted with the external merge sort
+EXTERNAL_SORT_CHUNK = 1_000_000 #number of values sorted in memory per spilled run
+COLUMN_STATS = {} #statistics of every column analysed so far, keyed by column name (or file path and column name)
+DISPLAY_LIMIT = 1000 #columnar data longer than this is abbreviated when printed
+PREVIEW_ROWS = 10 #rows of a streamed file echoed when it is opened
+FILL_OPERATIONS = {"max": "maximum", "min": "minimum", "avg": "average"} #ways of filling empty cells in batch mode
+FILL_CHOICES = {"max": "1", "min": "2", "avg": "3"} #headless --fill options mapped to the clean stage choices
+ORDER_CHOICES = {"asc": "1", "desc": "2"} #headless --order options mapped to the analyze stage choices
+PARALLEL_CHUNK_SIZE = 64 * 1024 * 1024 #largest byte range parsed by one worker task of the parallel loader
+HISTOGRAM_MODES = ["fixed", "quantile", "log"] #ways of placing the bin edges of the histogram chart
+HISTOGRAM_BINS = 10 #default number of bins, which is also the height of the chart
+HISTOGRAM_WIDTH = 50 #number of stars of the tallest bin
+STREAMING_HISTOGRAM_CENTROIDS = 256 #number of centroids kept by StreamingHistogram
+KLL_K = 200 #size of the top compactor of the quantile sketch, the rank error is about 1.7/KLL_K
+TOP_K = 5 #number of largest and smallest values kept by the streaming summary
+SUMMARY_QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99] #quantiles displayed by the streaming summary
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data_analysis") #where parsed columns are cached
+STATE_DIR = os.path.join(CACHE_DIR, "incremental") #where the incremental mode keeps its state between runs
+STATE_CHECK_SIZE = 64 * 1024 #leading bytes of the file hashed to detect that it was rewritten rather than appended to
+
+class CsvRowStream:
+    """
+    A re-iterable stream over the data rows of a CSV file (the header row is skipped).
+
+    Rows are read lazily from disk every time the stream is iterated, so memory use stays
+    flat regardless of the file size and the stream can be walked again if the user picks
+    another column.
+    """
+
+    def __init__(self, file_path):
+        """Stores the path of the csv file to stream rows from"""
+        self.file_path = file_path
+
+    def __iter__(self):
+        """Opens the file and yields one row (a list of strings) at a time"""
+        with open(self.file_path, "r") as file:
+            data = csv.reader(file)
+            next(data, None) #skip the header
+            yield from data
+
+def open_file(stream=True, preview_rows=PREVIEW_ROWS):
     """
     Prompts the user to enter a file path and attempts to open and read a CSV 
     file from that path. Continuously prompts until a valid file path is provided.
     The function reads the file, prints its headers, and lines, and then allows 
     the user to select a column.
 
-    Returns: A list of the csv file data and the header content
+    In stream mode (the default) the rows are not loaded or echoed: only the header and
+    the first preview_rows rows are read, and a CsvRowStream over the file is returned
+    instead of a list so later stages pull the rows lazily. With stream set to False
+    every row is loaded and echoed.
+
+    Returns: A list (or a CsvRowStream in stream mode) of the csv file data and the header content
     """
     data_list = []
     while True:
@@ -39,9 +114,14 @@ def open_file():
                 data = csv.reader(file) #read the csv content as lists
                 header = next(data) #save the header and skip it
                 print(header) #just display header to let the user know the names of columns
-                for line in data: #display file data (as rows)
-                    data_list.append(line) #add the rows to the data list to perform operations on it later
-                    print(line) #show it to the user
+                if stream: #only show a preview, the rows are streamed from disk later
+                    for line in islice(data, preview_rows):
+                        print(line)
+                    data_list = CsvRowStream(file_path)
+                else:
+                    for line in data: #display file data (as rows)
+                        data_list.append(line) #add the rows to the data list to perform operations on it later
+                        print(line) #show it to the user
                 print("")
                 print("Choose column from selection below to clear and prepare data: ")
                 for i in range(0, len(header)): #display header columns names
@@ -71,28 +151,105 @@ def check_column(header):
                 return column, header[column] #return the column of the header and its index
         column_input = input("Column doesn't exist, Please try again: ") #if not found keep asking the user to enter the column name
 
-def collect_column_values(data_list, column_index, header):
+def iter_column(data_list, column_index):
+    """
+    Yields the cell of a single column from every row, without keeping the rows around.
+
+    Parameters:
+        data_list (iterable of list): The rows, either a list or a CsvRowStream.
+        column_index (int): The index of the column to extract.
+    """
+    for row in data_list:
+        yield row[column_index]
+
+class NumericColumn:
+    """
+    A numerical column stored as packed floats plus a validity mask, parsed once.
+
+    With NumPy installed both are NumPy arrays and the pipeline stages work on them with
+    vectorized operations, otherwise they are an array('d') and a bytearray.
+
+    Attributes:
+        values: The float64 values of the column, 0.0 where the cell is empty
+        valid: The validity mask, True (or 1) where the cell holds a number
+
+    Methods:
+        from_strings: Builds a column from a list of strings
+        missing_count: The number of empty cells
+        to_strings: Converts the column back to a list of strings
+    """
+
+    __slots__ = ["values", "valid"]
+
+    def __init__(self, values, valid):
+        """Wraps the value array and the validity mask, converting them to NumPy arrays when available"""
+        if np is not None:
+            values = np.asarray(values, dtype=np.float64) #array('d') and bytearray are converted without parsing
+            valid = np.asarray(valid, dtype=bool)
+        self.values = values
+        self.valid = valid
+
+    @classmethod
+    def from_strings(cls, column_values):
+        """Parses a list of strings (empty strings are missing values) into a NumericColumn"""
+        values = array("d")
+        valid = bytearray()
+        for value in column_values:
+            if value.strip():
+                values.append(float(value))
+                valid.append(1)
+            else:
+                values.append(0.0)
+                valid.append(0)
+        return cls(values, valid)
+
+    def __len__(self):
+        """Returns the number of cells in the column"""
+        return len(self.values)
+
+    def missing_count(self):
+        """Returns the number of empty cells"""
+        if np is not None:
+            return int(len(self.valid) - np.count_nonzero(self.valid))
+        return self.valid.count(0)
+
+    def to_strings(self):
+        """Converts the column back to a list of strings, empty strings for missing cells"""
+        return [str(float(value)) if is_valid else "" for value, is_valid in zip(self.values, self.valid)]
+
+    def __str__(self):
+        """Displays the column like a list of strings, abbreviated when it is long"""
+        if len(self) <= DISPLAY_LIMIT:
+            return str(self.to_strings())
+        head = NumericColumn(self.values[:5], self.valid[:5]).to_strings()
+        tail = NumericColumn(self.values[-5:], self.valid[-5:]).to_strings()
+        return f"{str(head)[:-1]}, ..., {str(tail)[1:]} ({len(self)} values)"
+
+def collect_column_values(data_list, column_index, header, columnar=False):
     """
     Collects and validates that all entries in a specified column are numeric. If non-numeric entries are found,
     prompts the user to select a different column.
 
     Parameters:
-        data_list (list of list): The dataset from which to collect column values.
+        data_list (iterable of list): The dataset from which to collect column values, a list of rows or a CsvRowStream.
         column_index (int): The index of the column to collect values from.
         header (list of str): The header names of the dataset.
+        columnar (bool): Return a NumericColumn built while validating instead of a list of strings.
 
     Returns:
-        list: A list of numeric values from the specified column.
+        list or NumericColumn: The numeric values from the specified column.
     """
     numeric_flag = True
     column_values = [] #create an empty list to store the numerical column
     while numeric_flag:
         try:
-            for item in data_list: #loop in the column data 
-                if (item[column_index].strip() == "") or float(item[column_index].strip()): #if the element is either an empty string or a number add it to the list
-                    #print("pass")
-                    column_values.append(item[column_index])
-                    continue
+            if columnar: #validate and parse in the same pass
+                column_values = NumericColumn.from_strings(iter_column(data_list, column_index))
+                break
+            for value in iter_column(data_list, column_index): #loop in the column data 
+                if value.strip(): #empty strings are kept, anything else has to be a number
+                    float(value) #raises ValueError for a non-numerical value
+                column_values.append(value)
             numeric_flag = False
         except ValueError: #if an error occured (no empty or numerical value then handel the exeption and reprompt the user)
             column_values = [] #clear the column values list and reprompt user
@@ -113,114 +270,724 @@ def clean_choice():
             clean_choice = input("Invalid choice. Enter again: ") #if not valid reprompt
     return clean_choice #return the choice from the user
 
-def get_max(column_values):
+class ColumnStats:
+    """
+    Summary statistics of a numerical column gathered in a single pass.
+
+    The mean and variance are updated with Welford's algorithm and the sum with
+    Kahan-Babuska (Neumaier) compensated summation, so long columns of large or
+    decimal values do not lose precision.
+
+    Attributes:
+        count: The number of numeric values seen, an int
+        missing: The number of empty cells seen, an int
+        minimum: The smallest value, a float or None for an empty column
+        maximum: The largest value, a float or None for an empty column
+        mean: The running mean of the values, a float
+
+    Methods:
+        add: Adds a numeric value to the statistics
+        add_missing: Counts an empty cell
+        merge: Combines the statistics of another part of the same column
+        fill_missing: Updates the statistics as if every empty cell was replaced with a value
+        total: The compensated sum of the values
+        variance: The sample variance of the values
+    """
+
+    __slots__ = ["count", "missing", "minimum", "maximum", "mean", "_m2", "_sum", "_compensation"]
+
+    def __init__(self):
+        """Starts with no values seen"""
+        self.count = 0
+        self.missing = 0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self._m2 = 0.0 #sum of squared differences from the mean (Welford)
+        self._sum = 0.0
+        self._compensation = 0.0 #low order bits lost by the running sum (Neumaier)
+
+    def _add_to_sum(self, value):
+        """Adds a value to the running sum keeping track of the rounding error"""
+        new_sum = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - new_sum) + value
+        else:
+            self._compensation += (value - new_sum) + self._sum
+        self._sum = new_sum
+
+    def add(self, value):
+        """Adds one numeric value (a float) to the statistics"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self._add_to_sum(value)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def add_missing(self):
+        """Counts one empty cell"""
+        self.missing += 1
+
+    def merge(self, other):
+        """
+        Combines the statistics of another part of the same column into this one
+        (Chan's parallel variance formula), so chunks can be summarized separately.
+        """
+        if other.count:
+            total_count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total_count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / total_count
+            self.count = total_count
+            self._add_to_sum(other._sum)
+            self._add_to_sum(other._compensation)
+            if self.minimum is None or other.minimum < self.minimum:
+                self.minimum = other.minimum
+            if self.maximum is None or other.maximum > self.maximum:
+                self.maximum = other.maximum
+        self.missing += other.missing
+        return self
+
+    def fill_missing(self, value):
+        """
+        Updates the statistics as if every empty cell was replaced with value,
+        which is what replace_empty_values does, without rescanning the column.
+        """
+        if self.missing and value is not None:
+            filled = ColumnStats()
+            filled.count = self.missing
+            filled.mean = filled.minimum = filled.maximum = float(value)
+            filled._sum = float(value) * self.missing
+            self.missing = 0
+            self.merge(filled)
+        return self
+
+    def total(self):
+        """Returns the compensated sum of the values"""
+        return self._sum + self._compensation
+
+    def variance(self):
+        """Returns the sample variance of the values, or None with fewer than two values"""
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+    def to_dict(self):
+        """Returns the statistics as a dictionary that can be saved as JSON"""
+        return {"count": self.count, "missing": self.missing, "minimum": self.minimum, "maximum": self.maximum,
+                "mean": self.mean, "m2": self._m2, "sum": self._sum, "compensation": self._compensation}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds statistics saved with to_dict"""
+        stats = cls()
+        stats.count, stats.missing = data["count"], data["missing"]
+        stats.minimum, stats.maximum, stats.mean = data["minimum"], data["maximum"], data["mean"]
+        stats._m2, stats._sum, stats._compensation = data["m2"], data["sum"], data["compensation"]
+        return stats
+
+    def __str__(self):
+        """Displays the count, missing count, minimum, maximum, mean and variance"""
+        variance = self.variance()
+        return (f"Count: {self.count}, Missing: {self.missing}, Min: {self.minimum}, Max: {self.maximum}, "
+                f"Mean: {round(self.mean, 2)}, Variance: {None if variance is None else round(variance, 2)}")
+
+def compute_column_stats(column_values):
+    """
+    Scans a column once and gathers all of its statistics.
+
+    Args:
+        column_values (iterable of str or NumericColumn): Strings that are either empty or represent a numeric value.
+
+    Returns:
+        ColumnStats: The statistics of the column.
+    """
+    stats = ColumnStats()
+    if isinstance(column_values, NumericColumn):
+        if np is not None: #vectorized aggregates over the valid values
+            numbers = column_values.values[column_values.valid]
+            stats.missing = len(column_values) - len(numbers)
+            if len(numbers):
+                stats.count = len(numbers)
+                stats.minimum = float(numbers.min())
+                stats.maximum = float(numbers.max())
+                stats.mean = float(numbers.mean())
+                stats._m2 = float(numbers.var()) * len(numbers)
+                stats._sum = float(numbers.sum()) #NumPy uses pairwise summation
+            return stats
+        for value, is_valid in zip(column_values.values, column_values.valid):
+            if is_valid:
+                stats.add(value)
+            else:
+                stats.add_missing()
+        return stats
+    for value in column_values:
+        if value.strip(): #this will be False for empty or whitespace only strings
+            stats.add(float(value)) #each value is parsed only once
+        else:
+            stats.add_missing()
+    return stats
+
+def get_column_stats(column_values, column_name=None):
+    """
+    Returns the statistics of a column, computing them on the first call only.
+    The result is cached in COLUMN_STATS under column_name so the cleaning, analysis
+    and visualization stages share a single scan of the column.
+
+    Args:
+        column_values (iterable of str): The column to summarize.
+        column_name (str): The key of the column in the cache, None disables caching.
+
+    Returns:
+        ColumnStats: The statistics of the column.
+    """
+    if column_name is None:
+        return compute_column_stats(column_values)
+    if column_name not in COLUMN_STATS: #only scan the column the first time it is asked for
+        COLUMN_STATS[column_name] = compute_column_stats(column_values)
+    return COLUMN_STATS[column_name]
+
+def get_max(column_values, stats=None):
     """
     Calculate the maximum numeric value from a list of strings. Ignores empty strings.
 
     Args:
     column_values (list of str): A list of strings, where each string is expected to represent a numeric value.
+    stats (ColumnStats): Already computed statistics of the column, the column is scanned if not given.
 
     Returns:
     float or None: The maximum value found, or empty string if no valid numeric value exists.
     """
-    max_num = "" #set max to an empty string if no number is found
-    for i in column_values:
-        if i.strip(): #this will be False for empty or whitespace only strings
-            current_num = float(i) #convert this string to float
-            if max_num == "" or current_num > max_num: #if the current value is bigger than than the max then this is bigger hence it is the max
-                max_num = current_num #if condition met set the max num as current num
-    return max_num
+    if stats is None:
+        stats = compute_column_stats(column_values)
+    return stats.maximum if stats.count else "" #empty string if no number is found
 
-def get_min(column_values):
+def get_min(column_values, stats=None):
     """
     Calculate the minimum numeric value from a list of strings. Ignores empty strings.
 
     Args:
     column_values (list of str): A list of strings, where each string is expected to represent a numeric value.
+    stats (ColumnStats): Already computed statistics of the column, the column is scanned if not given.
 
     Returns:
     float or None: The minimum value found, or empty string if no valid numeric value exists.
     """
-    min_num = "" #set max to an empty string if no number is found
-    for i in column_values:
-        if i.strip(): #this will be False for empty or whitespace only strings
-            current_num = float(i) #convert this string to float
-            if min_num == "" or current_num < min_num: #if the current value is smaller than than the minimum then this is bigger hence it is the minimum
-                min_num = current_num #if condition met set the min num as current num
-    return min_num
+    if stats is None:
+        stats = compute_column_stats(column_values)
+    return stats.minimum if stats.count else "" #empty string if no number is found
 
-def get_avrg(column_values):
+def get_avrg(column_values, stats=None):
     """
     Calculate the average of numeric values in a list of strings, ignoring empty strings.
     Empty strings are skipped. Returns the average rounded to two decimal places.
 
     Args:
         column_values (list of str): List of strings to calculate the average from.
+        stats (ColumnStats): Already computed statistics of the column, the column is scanned if not given.
 
     Returns:
         float or empty: The average of the numeric values, or None if no numbers are present.
     """
-    number_of_elements = 0
-    sum = 0
-    try:
-        for item in column_values: #loop through the items in the column
-            if item.strip() == "":  #if the element is empty skip it
-                continue
-            number_of_elements += 1 #increase counter by 1 if number is found
-            sum += int(item.strip()) #add the number to the total sum
-        return round(sum/number_of_elements, 2) #return the rounded average
-    except ZeroDivisionError:
-        return None #if no elements are present it means that this is an empty list
+    if stats is None:
+        stats = compute_column_stats(column_values)
+    if stats.count == 0: #if no elements are present it means that this is an empty list
+        return None
+    return round(stats.mean, 2) #return the rounded average
 
 def replace_empty_values(column_values, empty_cell_value):
     """
     Replace empty strings in a list of column values with a specified value.
 
     Args:
-        column_values (list of str): List of column values (strings) to process.
+        column_values (list of str or NumericColumn): List of column values (strings) to process.
         empty_cell_value (any): Value to replace empty strings with, will be converted to string.
 
     Returns:
         None: The function modifies the list in place.
     """
+    if isinstance(column_values, NumericColumn):
+        if empty_cell_value is None or empty_cell_value == "": #nothing to fill an empty column with
+            return
+        if np is not None:
+            column_values.values[~column_values.valid] = float(empty_cell_value) #fill every masked cell at once
+            column_values.valid[:] = True
+        else:
+            for element in range(0, len(column_values)):
+                if not column_values.valid[element]:
+                    column_values.values[element] = float(empty_cell_value)
+                    column_values.valid[element] = 1
+        return
     for element in range(0, len(column_values)): #loop in the column
         if column_values[element].strip() == "": #if empty replace it with the empty cell value (max, min or avg)
             column_values[element] = str(empty_cell_value)
 
-def insertion_sort(cleaned_column_values):
+def parse_sort_keys(column_values):
+    """
+    Converts a list of strings that represent numeric values into a list of floats.
+    Every value is parsed exactly once so the sort compares plain floats afterwards.
+
+    Args:
+        column_values (iterable of str): The values to convert.
+
+    Returns:
+        list of float: The numeric key of every value, in the original order.
+    """
+    return [float(value) for value in column_values] #float() ignores surrounding whitespace so no strip() is needed
+
+def _write_sorted_run(keys, descending):
+    """
+    Sorts a chunk of keys in memory and spills it to an anonymous temporary file as raw doubles.
+
+    Returns:
+        file: The temporary file rewound to its start, ready to be read back.
+    """
+    keys.sort(reverse=descending) #sort the chunk in memory (timsort, O(n log n))
+    run_file = tempfile.TemporaryFile() #the file is deleted automatically once closed
+    array("d", keys).tofile(run_file) #write the chunk as packed 8 byte floats
+    run_file.seek(0)
+    return run_file
+
+def _read_sorted_run(run_file, block_size):
+    """
+    Reads a spilled run back block by block and yields its keys one at a time.
+    """
+    while True:
+        block = array("d")
+        try:
+            block.fromfile(run_file, block_size) #read the next block of floats
+        except EOFError: #the last block is shorter than block_size, the items read are still kept
+            yield from block
+            return
+        yield from block
+
+def external_sort(keys, descending=False, chunk_size=EXTERNAL_SORT_CHUNK):
     """
-    Sorts a list of strings that represent numeric values in ascending order using the insertion sort algorithm.
+    Sorts an iterable of floats that may not fit in memory using an external merge sort.
+    The input is cut into chunks of chunk_size keys, each chunk is sorted and spilled to a
+    temporary file, then all the files are merged lazily with a k-way heap merge.
 
     Args:
-        cleaned_column_values (list of str): The list of strings to sort.
+        keys (iterable of float): The keys to sort, consumed only once.
+        descending (bool): Sort from largest to smallest when True.
+        chunk_size (int): The number of keys held in memory at a time.
+
+    Yields:
+        float: The keys in sorted order.
     """
-    for idx in range(1, len(cleaned_column_values)): #iterate through each element in the list starting from the second element.
-        key = float(cleaned_column_values[idx].strip()) #convert the current element to a float after stripping any whitespace.
+    run_files = []
+    try:
+        chunk = []
+        for key in keys: #cut the input into sorted runs
+            chunk.append(key)
+            if len(chunk) >= chunk_size:
+                run_files.append(_write_sorted_run(chunk, descending))
+                chunk = []
+        if chunk: #spill whatever is left of the last chunk
+            run_files.append(_write_sorted_run(chunk, descending))
+        block_size = max(1, chunk_size // max(1, len(run_files))) #share the memory budget between the runs
+        runs = [_read_sorted_run(run_file, block_size) for run_file in run_files]
+        yield from heapq.merge(*runs, reverse=descending) #merge all runs in a single pass
+    finally:
+        for run_file in run_files: #always remove the spill files, even if the caller stops early
+            run_file.close()
 
-        j = idx - 1 #initialize the position for comparing 'key' with the sorted part of the list.
-        while j>=0 and key<float(cleaned_column_values[j].strip()): # Continue moving elements one position to the right as long as 'key' is less than elements in the sorted part.
-            cleaned_column_values[j+1]=cleaned_column_values[j] #move the element at index 'j' to the right to make space for 'key'.
-            j=j-1 #decrement 'j' to compare 'key' with the next element on the left.
-        cleaned_column_values[j+1] = str(key) #insert 'key' in its correct position in the sorted part of the list.
-    cleaned_column_values[0] = str(float(cleaned_column_values[0].strip())) #convert the first element to a string
+def _drain_sort_keys(column_values, chunk_size=EXTERNAL_SORT_CHUNK):
+    """
+    Yields the float key of every value while emptying the list from its end, one chunk
+    at a time, so the strings are freed as their keys are spilled. The order of the keys
+    is not kept, they are sorted afterwards.
+    """
+    while column_values:
+        chunk = column_values[-chunk_size:]
+        del column_values[-chunk_size:]
+        for value in chunk:
+            yield float(value)
 
-def reverse_insertion_sort(cleaned_column_values):
+def sort_column_values(cleaned_column_values, descending=False):
     """
-    Sorts a list of strings that represent numeric values in descending order using the insertion sort algorithm.
-    Same as insertion sort algorithm but to sort in a descending order key>data_array[j]
+    Sorts a list of strings that represent numeric values in ascending or descending order.
+    Each value is parsed once into a float key and the keys are sorted in O(n log n). Columns
+    longer than EXTERNAL_SORT_THRESHOLD are sorted with external_sort: the list is drained
+    into the spilled runs and refilled from the merge, so neither the float keys nor a
+    second copy of the column are ever held in memory.
+
+    A NumericColumn is sorted directly on its float values (with np.sort when NumPy is
+    installed); any cell that is still empty is moved to the end.
+
     Args:
-        cleaned_column_values (list of str): The list of strings to sort.
+        cleaned_column_values (list of str or NumericColumn): The values to sort, sorted in place.
+        descending (bool): Sort from largest to smallest when True.
+    """
+    if isinstance(cleaned_column_values, NumericColumn):
+        _sort_numeric_column(cleaned_column_values, descending)
+        return
+    if len(cleaned_column_values) > EXTERNAL_SORT_THRESHOLD: #huge column, spill sorted runs to disk
+        sorted_keys = external_sort(_drain_sort_keys(cleaned_column_values), descending)
+        cleaned_column_values.extend(map(str, sorted_keys)) #the runs are all spilled, the list is empty again
+        return
+    sorted_keys = parse_sort_keys(cleaned_column_values) #parse every value once
+    sorted_keys.sort(reverse=descending)
+    cleaned_column_values[:] = map(str, sorted_keys) #write the sorted values back as strings like before
+
+def _sort_numeric_column(column, descending):
+    """
+    Sorts the valid values of a NumericColumn in place and moves the empty cells to the end.
     """
-    for idx in range(1, len(cleaned_column_values)): #iterate through each element in the list starting from the second element.
-        key = float(cleaned_column_values[idx].strip()) #convert the current element to a float after stripping any whitespace.
+    if np is not None:
+        numbers = np.sort(column.values[column.valid], kind="stable")
+        if descending:
+            numbers = numbers[::-1]
+        column.values[:len(numbers)] = numbers
+        column.values[len(numbers):] = 0.0
+        column.valid[:len(numbers)] = True
+        column.valid[len(numbers):] = False
+        return
+    numbers = (value for value, is_valid in zip(column.values, column.valid) if is_valid)
+    if len(column) > EXTERNAL_SORT_THRESHOLD: #the merge fills the new array directly, no list of floats is built
+        sorted_values = array("d", external_sort(numbers, descending))
+    else:
+        sorted_values = array("d", sorted(numbers, reverse=descending))
+    missing = len(column) - len(sorted_values)
+    sorted_values.extend([0.0] * missing)
+    column.values = sorted_values
+    column.valid = bytearray(b"\x01") * (len(column) - missing) + bytearray(missing)
+
+def detect_numeric_columns(data_list, header):
+    """
+    Streams the rows once and collects every column whose cells are all empty or numeric.
+    A column is dropped as soon as a non-numerical cell is found, and columns that are
+    completely empty are ignored. Short rows count as empty cells.
+
+    Parameters:
+        data_list (iterable of list): The rows, a list or a CsvRowStream.
+        header (list of str): The header names of the dataset.
+
+    Returns:
+        dict: The column name mapped to its NumericColumn, in header order.
+    """
+    candidates = {index: (array("d"), bytearray()) for index in range(len(header))} #every column is numeric until proven otherwise
+    for row in data_list:
+        for index in list(candidates): #copy the keys, a column may be dropped while looping
+            values, valid = candidates[index]
+            cell = row[index].strip() if index < len(row) else ""
+            if cell:
+                try:
+                    values.append(float(cell))
+                except ValueError: #non-numerical cell, this column is not analysed
+                    del candidates[index]
+                    continue
+                valid.append(1)
+            else:
+                values.append(0.0)
+                valid.append(0)
+        if not candidates: #no numerical column left, stop reading
+            break
+    return {header[index].strip(): NumericColumn(values, valid)
+            for index, (values, valid) in candidates.items() if 1 in valid}
+
+def get_fill_value(stats, fill):
+    """Returns the value used to fill empty cells for a fill choice ("max", "min" or "avg")"""
+    if fill == "max":
+        return get_max(None, stats)
+    if fill == "min":
+        return get_min(None, stats)
+    return get_avrg(None, stats)
+
+def summarize_column(column, fill="avg", descending=False):
+    """
+    Cleans, sorts and summarizes a single NumericColumn, this is the unit of work of the
+    batch mode and runs inside a worker process.
+
+    Returns:
+        tuple: The ColumnStats of the cleaned column and its median.
+    """
+    stats = compute_column_stats(column)
+    empty_cell_value = get_fill_value(stats, fill)
+    replace_empty_values(column, empty_cell_value)
+    stats.fill_missing(empty_cell_value)
+    sort_column_values(column, descending)
+    count = len(column) - column.missing_count() #valid values are at the start after sorting
+    if count == 0:
+        return stats, None
+    middle = count // 2
+    if count % 2: #odd number of values, the median is the middle one
+        return stats, float(column.values[middle])
+    return stats, (float(column.values[middle - 1]) + float(column.values[middle])) / 2
+
+def analyze_all_columns(data_list, header, fill="avg", descending=False, workers=None):
+    """
+    Batch mode: detects the numerical columns while streaming the file once, then cleans,
+    sorts and summarizes all of them with the per column work spread over a process pool.
+
+    Parameters:
+        data_list (iterable of list): The rows, a list or a CsvRowStream.
+        header (list of str): The header names of the dataset.
+        fill (str): How empty cells are filled, "max", "min" or "avg".
+        descending (bool): Sort the columns in descending order.
+        workers (int): The number of worker processes, None uses one per CPU and 1 runs in this process.
+
+    Returns:
+        dict: The column name mapped to the (ColumnStats, median) summary of the column.
+    """
+    columns = detect_numeric_columns(data_list, header)
+    names = list(columns)
+    column_list = [columns.pop(name) for name in names] #hand the columns over to the workers
+    if workers == 1 or len(names) <= 1: #not worth starting processes
+        summaries = [summarize_column(column, fill, descending) for column in column_list]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            summaries = list(executor.map(summarize_column, column_list,
+                                          [fill] * len(names), [descending] * len(names)))
+    return dict(zip(names, summaries))
+
+def print_batch_summary(summaries):
+    """Displays one line of statistics per analysed column"""
+    if not summaries:
+        print("No numerical columns found.")
+    for name, (stats, median) in summaries.items():
+        print(f"{name}: {stats}, Median: {median}")
+
+class KLLSketch:
+    """
+    A mergeable quantile sketch (Karnin, Lang and Liberty) with bounded memory.
+
+    Values go into a stack of compactors. When a compactor is full it is sorted and every
+    other value (odd or even positions, picked at random) moves up one level, where each
+    value stands for twice as many values. The compactors shrink geometrically towards the
+    bottom, so the sketch holds O(k) values whatever the length of the stream.
+
+    Methods:
+        add: Adds a value
+        merge: Adds all the values summarized by another sketch
+        quantile: The approximate value at a given quantile
+        to_dict/from_dict: Saves and reloads the sketch
+    """
+
+    def __init__(self, k=KLL_K, seed=None):
+        """Starts with an empty sketch, seed makes the sampling reproducible"""
+        self.k = k
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self._random = random.Random(seed)
+        self._compactors = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level):
+        """Returns the number of values the compactor at level can hold, the top one holds k"""
+        depth = len(self._compactors) - level - 1
+        return ceil(self.k * (2 / 3) ** depth) + 1
+
+    def _grow(self):
+        """Adds a compactor on top of the stack"""
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self._compactors)))
+
+    def add(self, value):
+        """Adds one value (a float) to the sketch"""
+        self.count += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self._compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self):
+        """Compacts full compactors until the sketch fits in its maximum size again"""
+        while self._size >= self._max_size:
+            for level, items in enumerate(self._compactors):
+                if len(items) >= self._capacity(level):
+                    if level + 1 == len(self._compactors):
+                        self._grow()
+                    items.sort()
+                    kept = items[:len(items) % 2] #an odd item stays at this level
+                    promoted = items[len(kept) + self._random.getrandbits(1)::2]
+                    self._compactors[level] = kept
+                    self._compactors[level + 1].extend(promoted)
+                    self._size -= len(items) - len(kept) - len(promoted)
+                    break
+            else: #every compactor fits, only the total size is over
+                break
+
+    def merge(self, other):
+        """Adds all the values summarized by another sketch, level by level"""
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for level, items in enumerate(other._compactors):
+            self._compactors[level].extend(items)
+        self._size = sum(len(items) for items in self._compactors)
+        self.count += other.count
+        if other.count:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self._compress()
+        return self
+
+    def quantile(self, fraction):
+        """Returns the approximate value below which the given fraction (0 to 1) of the values fall"""
+        if self.count == 0:
+            return None
+        if fraction <= 0:
+            return self.minimum
+        if fraction >= 1:
+            return self.maximum
+        weighted = sorted((value, 2 ** level) for level, items in enumerate(self._compactors) for value in items)
+        target = fraction * sum(weight for value, weight in weighted)
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return self.maximum
+
+    def to_dict(self):
+        """Returns the sketch as a dictionary that can be saved as JSON"""
+        return {"k": self.k, "count": self.count, "minimum": self.minimum, "maximum": self.maximum,
+                "compactors": self._compactors}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds a sketch saved with to_dict"""
+        sketch = cls(data["k"])
+        sketch.count, sketch.minimum, sketch.maximum = data["count"], data["minimum"], data["maximum"]
+        sketch._compactors = [[]]
+        for level in range(1, len(data["compactors"])):
+            sketch._grow()
+        sketch._compactors = [list(items) for items in data["compactors"]]
+        sketch._size = sum(len(items) for items in sketch._compactors)
+        return sketch
+
+class ExtremeValues:
+    """
+    Keeps the k largest and k smallest values of a stream with two bounded heaps.
+
+    Methods:
+        add: Adds a value
+        merge: Adds the extremes kept by another ExtremeValues
+        top: The k largest values, largest first
+        bottom: The k smallest values, smallest first
+    """
+
+    def __init__(self, k=TOP_K):
+        """Starts with no values seen"""
+        self.k = k
+        self._largest = [] #min-heap, its root is the smallest of the largest values
+        self._smallest = [] #min-heap of negated values, its root is the largest of the smallest values
+
+    def _push(self, heap, value):
+        """Pushes a value on a heap, dropping the root when the heap already holds k values"""
+        if len(heap) < self.k:
+            heapq.heappush(heap, value)
+        elif value > heap[0]:
+            heapq.heapreplace(heap, value)
+
+    def add(self, value):
+        """Adds one value (a float)"""
+        self._push(self._largest, value)
+        self._push(self._smallest, -value)
+
+    def merge(self, other):
+        """Adds the extremes kept by another ExtremeValues, which are all that can matter"""
+        for value in other._largest:
+            self._push(self._largest, value)
+        for value in other._smallest:
+            self._push(self._smallest, value)
+        return self
+
+    def top(self):
+        """Returns the largest values, largest first"""
+        return sorted(self._largest, reverse=True)
+
+    def bottom(self):
+        """Returns the smallest values, smallest first"""
+        return sorted(-value for value in self._smallest)
+
+class StreamingSummary:
+    """
+    The streaming summary stage: statistics, approximate quantiles and the largest and
+    smallest values of a column, gathered in one pass with bounded memory and without
+    sorting the column. Summaries of separate files or chunks can be merged, and saved
+    to JSON to be combined with later runs.
+
+    Attributes:
+        stats: The ColumnStats of the column
+        sketch: The KLLSketch of the numeric values
+        extremes: The ExtremeValues of the numeric values
+    """
+
+    def __init__(self, k=KLL_K, top_k=TOP_K):
+        """Starts with no values seen"""
+        self.stats = ColumnStats()
+        self.sketch = KLLSketch(k)
+        self.extremes = ExtremeValues(top_k)
+
+    def add(self, value):
+        """Adds a cell, an empty string counts as a missing value"""
+        if value.strip():
+            number = float(value)
+            self.stats.add(number)
+            self.sketch.add(number)
+            self.extremes.add(number)
+        else:
+            self.stats.add_missing()
+
+    def merge(self, other):
+        """Combines the summary of another part of the data into this one"""
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        self.extremes.merge(other.extremes)
+        return self
+
+    def to_dict(self):
+        """Returns the summary as a dictionary that can be saved as JSON"""
+        return {"stats": self.stats.to_dict(), "sketch": self.sketch.to_dict(),
+                "top": self.extremes.top(), "bottom": self.extremes.bottom(), "top_k": self.extremes.k}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds a summary saved with to_dict"""
+        summary = cls(data["sketch"]["k"], data["top_k"])
+        summary.stats = ColumnStats.from_dict(data["stats"])
+        summary.sketch = KLLSketch.from_dict(data["sketch"])
+        saved = ExtremeValues(data["top_k"])
+        saved._largest = list(data["top"])
+        saved._smallest = [-value for value in data["bottom"]]
+        heapq.heapify(saved._largest)
+        heapq.heapify(saved._smallest)
+        summary.extremes = saved
+        return summary
+
+    def __str__(self):
+        """Displays the statistics, the quantiles and the extreme values"""
+        quantiles = ", ".join(f"p{round(fraction * 100)}: {self.sketch.quantile(fraction)}"
+                              for fraction in SUMMARY_QUANTILES)
+        return (f"{self.stats}\nQuantiles (approximate): {quantiles}\n"
+                f"Top {self.extremes.k}: {self.extremes.top()}\nBottom {self.extremes.k}: {self.extremes.bottom()}")
 
-        j = idx - 1 #initialize the position for comparing 'key' with the sorted part of the list
-        while j>=0 and key>float(cleaned_column_values[j].strip()): #to sort in a descending order key>data_array[j]
-            cleaned_column_values[j+1]=cleaned_column_values[j] #move the element at index 'j' to the right to make space for 'key'.
-            j=j-1 #decrement 'j' to compare 'key' with the next element on the left.
-        cleaned_column_values[j+1] = str(key) #insert 'key' in its correct position in the sorted part of the list.
-    cleaned_column_values[-1] = str(float(cleaned_column_values[-1].strip())) #convert the first element to a string
+def summarize_stream(file_path, column_name):
+    """
+    Runs the streaming summary stage over one column of a CSV file.
 
+    Raises:
+        ValueError: If the column doesn't exist or is not numerical.
+    """
+    column_index = find_column(read_header(file_path), column_name)
+    summary = StreamingSummary()
+    try:
+        for value in iter_column(CsvRowStream(file_path), column_index):
+            summary.add(value)
+    except (ValueError, IndexError):
+        raise ValueError(f"Column {column_name} is not numerical") from None
+    return summary
 
 def check_sorting_choice(sorting_choice):
     """
@@ -237,6 +1004,101 @@ def check_sorting_choice(sorting_choice):
             return sorting_choice
         sorting_choice = input("Invalid choice. Please enter your choice again: ") #otherwise keep asking for the correct available choice
     
+class StageProfiler:
+    """
+    Measures the stages of the pipeline when profiling is enabled: wall time, CPU time,
+    rows per second and the peak resident memory (RSS) of the process after the stage.
+
+    With a capture mode ("cprofile" or "tracemalloc") every stage also runs under cProfile
+    or tracemalloc, and only the capture of the slowest stage is kept and written to
+    capture_dir. Capturing slows the stages down, the timings are then only relative.
+
+    Methods:
+        stage: Context manager measuring one stage
+        report: Prints the measurements and appends them as JSON lines to output_path
+    """
+
+    def __init__(self, enabled=False, output_path=None, capture=None, capture_dir=".", label=""):
+        """Creates a profiler, which does nothing unless enabled"""
+        self.enabled = enabled
+        self.output_path = output_path
+        self.capture = capture
+        self.capture_dir = capture_dir
+        self.label = label #the file being processed, included in every record
+        self.records = []
+        self._slowest_capture = None #(wall time, stage name, captured data) of the slowest stage so far
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the code run inside the with block as the stage name. The yielded dictionary
+        is the record of the stage, the caller sets its "rows" entry to get rows per second.
+        """
+        record = {"file": self.label, "stage": name, "rows": None}
+        if not self.enabled:
+            yield record
+            return
+        profile = None
+        if self.capture == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+        elif self.capture == "tracemalloc":
+            tracemalloc.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            captured = None
+            if profile is not None:
+                profile.disable()
+                captured = profile
+            elif self.capture == "tracemalloc":
+                captured = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            if captured is not None and (self._slowest_capture is None or wall > self._slowest_capture[0]):
+                self._slowest_capture = (wall, name, captured) #older captures are dropped
+            record["wall_seconds"] = wall
+            record["cpu_seconds"] = cpu
+            record["rows_per_second"] = record["rows"] / wall if record["rows"] and wall else None
+            record["peak_rss_kb"] = None
+            if resource is not None:
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                record["peak_rss_kb"] = peak // 1024 if sys.platform == "darwin" else peak #bytes on macOS, KB elsewhere
+            self.records.append(record)
+
+    def _write_capture(self):
+        """Writes the cProfile stats or the top tracemalloc allocations of the slowest stage"""
+        wall, name, captured = self._slowest_capture
+        os.makedirs(self.capture_dir, exist_ok=True)
+        prefix = os.path.join(self.capture_dir, f"{os.path.basename(self.label) or 'interactive'}.{name}")
+        if self.capture == "cprofile":
+            path = prefix + ".prof" #open with python -m pstats
+            captured.dump_stats(path)
+        else:
+            path = prefix + ".tracemalloc.txt"
+            with open(path, "w") as file:
+                for statistic in captured.statistics("lineno")[:50]: #the 50 biggest allocation sites
+                    file.write(f"{statistic}\n")
+        print(f"Slowest stage: {name} ({wall:.3f}s), {self.capture} capture written to {path}")
+
+    def report(self):
+        """Prints a line per stage and appends the records as JSON lines to output_path"""
+        if not self.enabled:
+            return
+        print("\nProfile:")
+        for record in self.records:
+            throughput = "" if record["rows_per_second"] is None else f", {record['rows_per_second']:,.0f} rows/s"
+            print(f"{record['stage']}: {record['wall_seconds']:.4f}s wall, {record['cpu_seconds']:.4f}s CPU"
+                  f"{throughput}, peak RSS {record['peak_rss_kb']} KB")
+        if self.output_path:
+            lines = "".join(json.dumps(record) + "\n" for record in self.records)
+            with open(self.output_path, "a") as file: #a single append, files processed in parallel don't interleave
+                file.write(lines)
+        if self._slowest_capture is not None:
+            self._write_capture()
+
 #Main program functions are below
 
 def welcome():
@@ -255,87 +1117,342 @@ def welcome():
     print("3. Analyse Data")
     print("4. Visualize Data")
 
-def load():
+def load(stream=True, preview_rows=PREVIEW_ROWS, columnar=True):
     """
     This function handles:
     1- opening the file
     2- check the column to process if valid
     3- gets the values of the numerical column with empty strings
     4- returns the column values and the column name
+
+    The rows are pulled lazily from disk and only the first preview_rows rows are
+    echoed (see open_file), unless stream is False. The column is returned as a
+    NumericColumn, which the later stages process with vectorized operations, or as a
+    list of strings when columnar is False.
     """
     print("\nStage 1: Load Data")
-    data_list, header = open_file() #get data list and header name using open file function
+    data_list, header = open_file(stream, preview_rows) #get data list and header name using open file function
     print("")
     column_index, column_name = check_column(header)
     #print(data_list) #For testing the output of our csv data list
-    column_values = collect_column_values(data_list, column_index, header)
+    column_values = collect_column_values(data_list, column_index, header, columnar)
     #print(column_values) #For displaying the content of a numeric column
     print("\nData Loaded Successfully")
     #print(type(column_values[0]))
     return column_values, column_name
 
-def clean(column_values):
+def clean(column_values, column_name=None, choice=None, echo=True):
     """
     The clean function takes the numerical column values from the load data function
     then it prpompts the user to input the choice of filling the empty values with
     inside the column with checking if the choice is valid or not. After replacing
     empty values with wanted choice it gets displayed after the update then returned
     to be used in analyzing data section.
+
+    The maximum, minimum and average come from a single scan of the column which is
+    cached under column_name and updated after the replacement for the later stages.
+    When choice is given the user is not prompted, and echo set to False skips
+    printing the whole column.
     """
     print("Stage 2: Clear and prepare data") #display cleaning options
-    print("Would you like to replace empty cells from column with:")
-    print("1. Maximum value from column")
-    print("2. Minimum value from column")
-    print("3. Average value from column")
-    choice = clean_choice() #validate choice
+    if choice is None:
+        print("Would you like to replace empty cells from column with:")
+        print("1. Maximum value from column")
+        print("2. Minimum value from column")
+        print("3. Average value from column")
+        choice = clean_choice() #validate choice
+    stats = get_column_stats(column_values, column_name) #scan the column once for all statistics
 
     if choice == "1": #make the empty cells value equal to max, min or average based on the input choice
         operation = "maximum"
-        empty_cell_value = get_max(column_values)
+        empty_cell_value = get_max(column_values, stats)
     elif choice == "2":
         operation = "minimum"
-        empty_cell_value = get_min(column_values)
+        empty_cell_value = get_min(column_values, stats)
     else:
         operation = "average"
-        empty_cell_value = get_avrg(column_values)
+        empty_cell_value = get_avrg(column_values, stats)
     
     #print(column_values) #To see before replacing the empty values
     print("")
     replace_empty_values(column_values, empty_cell_value) #perform the replacement
+    stats.fill_missing(empty_cell_value) #keep the statistics in line with the cleaned column
     print(f"All empty values are replaced with {operation} values!")
-    print(column_values) #print the column after replacement is done
+    if echo:
+        print(column_values) #print the column after replacement is done
     return column_values
 
-def analyze(cleaned_column_values):
+def analyze(cleaned_column_values, column_name=None, sorting_choice=None, echo=True):
     """
     This function is responsible for sorting the cleaned column data in acsending or 
-    descending order based on the user input. This function uses insertion sort for 
-    ascending order and reverse of the insertion sort for the descending order.
+    descending order based on the user input. This function uses sort_column_values
+    which parses every value once and sorts in O(n log n) for both orders. The cached
+    statistics of the column (if any) are displayed after sorting. When sorting_choice
+    is given the user is not prompted, and echo set to False skips printing the whole column.
     """
     print("\nStage 3: Analyse data")
-    print("Please choose if you want to sort column in:")
-    print("1. Ascending order")
-    print("2. Descending order")
-    sorting_choice = input("Please enter your choice: ") #ask user about the option
+    if sorting_choice is None:
+        print("Please choose if you want to sort column in:")
+        print("1. Ascending order")
+        print("2. Descending order")
+        sorting_choice = input("Please enter your choice: ") #ask user about the option
     sorting_choice_checked = check_sorting_choice(sorting_choice) #check the input and validate it
-    if sorting_choice_checked.strip() == "1": #if the choice is 1 perform isertion sort
-        insertion_sort(cleaned_column_values)
+    if sorting_choice_checked.strip() == "1": #if the choice is 1 sort in ascending order
+        sort_column_values(cleaned_column_values)
         print("Column values are sorted in ascending order!")
     else:
-        reverse_insertion_sort(cleaned_column_values) #if the choice is 2 perform inverse of insertion sort
+        sort_column_values(cleaned_column_values, descending=True) #if the choice is 2 sort in descending order
         print("Column values are sorted in descending order!")
-    print(cleaned_column_values) #print the sorted column
+    if echo:
+        print(cleaned_column_values) #print the sorted column
+    if column_name in COLUMN_STATS: #reuse the statistics from the cleaning stage
+        print(COLUMN_STATS[column_name])
     return cleaned_column_values #return the sorted column to be used in the vizualizing stage
 
-def visualize(sorted_column_values, column_name):
+def star_counts(column):
+    """
+    Computes the number of stars of every valid value of a NumericColumn, with the same
+    rules as visualize: one star per 5 units rounded up, at least one star and at most
+    20 stars for values of 100 and above. NumPy computes all the counts in one pass.
+
+    Returns:
+        iterable of int: The star count of each value.
+    """
+    if np is not None:
+        numbers = column.values[column.valid]
+        counts = np.ceil(numbers / 5)
+        counts[counts == 0] = 1 #if there are no items then it gets represented as a star only
+        counts[numbers >= 100.0] = 20
+        return counts.astype(np.int64).tolist()
+    counts = []
+    for value, is_valid in zip(column.values, column.valid):
+        if is_valid:
+            if value < 100.0:
+                counts.append(ceil(value / 5) or 1)
+            else:
+                counts.append(20)
+    return counts
+
+def histogram_edges(numbers, bins, mode):
+    """
+    Computes the bin edges of a histogram over a sorted sequence of numbers.
+
+    Parameters:
+        numbers (sequence of float): The sorted numbers.
+        bins (int): The number of bins.
+        mode (str): "fixed" for bins of equal width, "quantile" for bins holding about the
+            same number of values and "log" for bins of equal width on a log scale.
+
+    Returns:
+        list of float: The increasing bin edges, one more than the number of bins.
+    """
+    low, high = float(numbers[0]), float(numbers[-1])
+    if mode == "quantile":
+        edges = [float(numbers[min(len(numbers) - 1, (len(numbers) * step) // bins)]) for step in range(bins)]
+        edges.append(high)
+        edges = sorted(set(edges)) #repeated values give repeated edges
+    elif mode == "log":
+        if low <= 0:
+            raise ValueError("log bins need positive values")
+        edges = [low * (high / low) ** (step / bins) for step in range(bins + 1)]
+        edges[-1] = high #the rounding error could leave the maximum past the last edge
+    else:
+        edges = [low + (high - low) * step / bins for step in range(bins + 1)]
+        edges[-1] = high
+    if len(edges) < 2 or edges[0] == edges[-1]: #a single distinct value, use one bin around it
+        edges = [low - 0.5, high + 0.5]
+    return edges
+
+def compute_histogram(column_values, bins=HISTOGRAM_BINS, mode="fixed"):
+    """
+    Counts the values of a column per bin. With NumPy the edges and counts come from one
+    vectorized pass (np.histogram), otherwise every value is placed with a binary search.
+    Empty cells are not counted, and log bins ignore values that are not positive.
+
+    Parameters:
+        column_values (list of str or NumericColumn): The column to count.
+        bins (int): The number of bins.
+        mode (str): One of HISTOGRAM_MODES, see histogram_edges.
+
+    Returns:
+        tuple: The bin edges and the count of every bin.
+    """
+    if not isinstance(column_values, NumericColumn):
+        column_values = NumericColumn.from_strings(column_values)
+    if np is not None:
+        numbers = column_values.values[column_values.valid]
+        if mode == "log":
+            numbers = numbers[numbers > 0]
+        if len(numbers) == 0:
+            return [], []
+        if mode == "fixed": #np.histogram does not need the values sorted
+            counts, edges = np.histogram(numbers, bins)
+        else:
+            numbers = np.sort(numbers)
+            counts, edges = np.histogram(numbers, histogram_edges(numbers, bins, mode))
+        return edges.tolist(), counts.tolist()
+    numbers = sorted(value for value, is_valid in zip(column_values.values, column_values.valid)
+                     if is_valid and (mode != "log" or value > 0))
+    if not numbers:
+        return [], []
+    edges = histogram_edges(numbers, bins, mode)
+    counts = []
+    start = 0
+    for edge in edges[1:-1]: #the numbers are sorted, so each bin is a slice found with bisect
+        end = bisect.bisect_left(numbers, edge, start)
+        counts.append(end - start)
+        start = end
+    counts.append(len(numbers) - start) #the last bin includes its right edge, like np.histogram
+    return edges, counts
+
+class StreamingHistogram:
+    """
+    An approximate histogram built in one pass with bounded memory, for columns that
+    don't fit in memory (Ben-Haim and Tom-Tov's streaming histogram).
+
+    The histogram keeps at most max_centroids (value, count) centroids. New values are
+    buffered, and when the buffer is full the centroids closest to each other are merged
+    until only max_centroids are left. Histograms of different chunks can be merged.
+
+    Methods:
+        add: Adds a value, with an optional count
+        merge: Adds all the centroids of another StreamingHistogram
+        centroids: The compressed (value, count) centroids in increasing order
+        to_histogram: Approximate bin edges and counts
+    """
+
+    def __init__(self, max_centroids=STREAMING_HISTOGRAM_CENTROIDS):
+        """Starts with no values seen"""
+        self.max_centroids = max_centroids
+        self._centroids = [] #sorted (value, count) pairs
+        self._buffer = {} #value -> count of values added since the last compression
+
+    def add(self, value, count=1):
+        """Adds a value (a float) count times"""
+        self._buffer[value] = self._buffer.get(value, 0) + count
+        if len(self._buffer) >= self.max_centroids * 8: #compress in batches to keep add cheap
+            self._compress()
+
+    def merge(self, other):
+        """Adds all the values summarized by another StreamingHistogram"""
+        for value, count in other.centroids():
+            self.add(value, count)
+        return self
+
+    def _compress(self):
+        """Merges the buffered values into the centroids, then merges the closest centroids"""
+        points = sorted(list(self._buffer.items()) + self._centroids)
+        self._buffer = {}
+        values = [value for value, count in points]
+        counts = [count for value, count in points]
+        previous = list(range(-1, len(points) - 1))
+        following = list(range(1, len(points) + 1))
+        alive = [True] * len(points)
+        gaps = [(values[index + 1] - values[index], index, index + 1) for index in range(len(points) - 1)]
+        heapq.heapify(gaps)
+        remaining = len(points)
+        while remaining > self.max_centroids:
+            gap, left, right = heapq.heappop(gaps)
+            if not (alive[left] and alive[right] and following[left] == right):
+                continue #stale gap, one of its centroids was merged already
+            if gap != values[right] - values[left]:
+                continue #stale gap, a centroid moved when it absorbed a neighbour (its new gap was pushed then)
+            total = counts[left] + counts[right]
+            values[left] = (values[left] * counts[left] + values[right] * counts[right]) / total #weighted mean
+            counts[left] = total
+            alive[right] = False
+            following[left] = following[right]
+            if following[left] < len(points):
+                previous[following[left]] = left
+                heapq.heappush(gaps, (values[following[left]] - values[left], left, following[left]))
+            if previous[left] >= 0:
+                heapq.heappush(gaps, (values[left] - values[previous[left]], previous[left], left))
+            remaining -= 1
+        self._centroids = [(values[index], counts[index]) for index in range(len(points)) if alive[index]]
+
+    def centroids(self):
+        """Returns the (value, count) centroids in increasing order of value"""
+        if self._buffer:
+            self._compress()
+        return list(self._centroids)
+
+    def to_histogram(self, bins=HISTOGRAM_BINS):
+        """
+        Returns approximate fixed-width bin edges and counts, every centroid is counted in
+        the bin holding its value.
+        """
+        centroids = self.centroids()
+        if not centroids:
+            return [], []
+        edges = histogram_edges([centroids[0][0], centroids[-1][0]], bins, "fixed")
+        counts = [0] * (len(edges) - 1)
+        for value, count in centroids:
+            index = min(len(counts) - 1, bisect.bisect_right(edges, value) - 1)
+            counts[index] += count
+        return edges, counts
+
+def render_histogram(edges, counts, width=HISTOGRAM_WIDTH):
+    """
+    Prints a histogram as one bar per bin, so the height of the chart depends on the
+    number of bins only and not on the number of values. The tallest bar has width stars.
+    """
+    if not counts:
+        print("No values to display")
+        return
+    tallest = max(counts) or 1
+    for low, high, count in zip(edges, edges[1:], counts):
+        bar = "*" * ceil(count * width / tallest) if count else ""
+        print(f"{low:>12.6g} - {high:<12.6g}| {bar} {round(count)}")
+
+def stream_column_histogram(file_path, column_name, fill="avg", bins=HISTOGRAM_BINS):
+    """
+    Builds a StreamingHistogram and the ColumnStats of a column in one pass over the file,
+    without holding the column in memory. The empty cells are added at the end with the
+    fill value ("max", "min" or "avg").
+
+    Returns:
+        tuple: The bin edges, the counts and the ColumnStats of the column.
+    """
+    column_index = find_column(read_header(file_path), column_name)
+    stats = ColumnStats()
+    histogram = StreamingHistogram()
+    try:
+        for value in iter_column(CsvRowStream(file_path), column_index):
+            if value.strip():
+                number = float(value)
+                stats.add(number)
+                histogram.add(number)
+            else:
+                stats.add_missing()
+    except (ValueError, IndexError):
+        raise ValueError(f"Column {column_name} is not numerical") from None
+    empty_cell_value = get_fill_value(stats, fill)
+    if stats.missing and empty_cell_value is not None:
+        histogram.add(float(empty_cell_value), stats.missing)
+        stats.fill_missing(empty_cell_value)
+    edges, counts = histogram.to_histogram(bins)
+    return edges, counts, stats
+
+def visualize(sorted_column_values, column_name, mode="stars", bins=HISTOGRAM_BINS):
     """
     The visualize function takes the sorted column values and displays each number
     in the list with the correct number of stars (for each 5 items there is a star 
     equivalent in the graph).
+
+    With mode set to one of HISTOGRAM_MODES a histogram of bins bars is displayed
+    instead of one line per value.
     """
     print("Stage 4: Visualise Data")
     print(f"Column: {column_name}")
+    if mode in HISTOGRAM_MODES:
+        print(f"Histogram: {bins} {mode} bins\n")
+        edges, counts = compute_histogram(sorted_column_values, bins, mode)
+        render_histogram(edges, counts)
+        return
     print("Legend: each ‘*’ represents 5 units\n")
+    if isinstance(sorted_column_values, NumericColumn): #star counts computed at once, printed in one write
+        print("\n".join("*" * count for count in star_counts(sorted_column_values)))
+        return
     for element in sorted_column_values: #loop in the sorted list
         if float(element.strip()) < 100.0: #if the number is less than 100 represent every 5 items as a star
             stars_count = ceil(float(element.strip())/5) #divide the number of items by 5 and round the number to the closest upper integer
@@ -345,7 +1462,598 @@ def visualize(sorted_column_values, column_name):
             stars_count = 20 #if the items number is bigger than 100 then we represent the number of items by 20 equivalent stars
         print(stars_count*"*") #multiply the number of star counts by the star string and print it for each element in the list
 
-def main():
+def column_cache_key(file_path, column_name):
+    """
+    Returns the cache key of a column: a hash of the file path and column name followed by
+    a hash of the file fingerprint (size and modification time), so any change to the file
+    gives a new key.
+    """
+    file_info = os.stat(file_path)
+    column_id = hashlib.sha1(f"{os.path.abspath(file_path)}\0{column_name}".encode()).hexdigest()[:16]
+    fingerprint = hashlib.sha1(f"{file_info.st_size}\0{file_info.st_mtime_ns}".encode()).hexdigest()[:16]
+    return f"{column_id}-{fingerprint}"
+
+def _map_file(path, typecode):
+    """Memory-maps a cache file copy-on-write so the pipeline can modify the column without touching the file"""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0: #an empty file can't be mapped
+            return array(typecode)
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    return memoryview(mapped).cast(typecode) #the view keeps the mapping alive
+
+def load_cached_column(cache_dir, key):
+    """
+    Loads a column from the cache. The values are memory-mapped rather than read, and the
+    validity mask is loaded next to them.
+
+    Returns:
+        NumericColumn or None: The cached column, None if it is not in the cache.
+    """
+    values_path = os.path.join(cache_dir, key + ".values")
+    valid_path = os.path.join(cache_dir, key + ".valid")
+    try:
+        valid_size = os.path.getsize(valid_path)
+        if os.path.getsize(values_path) != valid_size * 8: #incomplete entry
+            return None
+        if np is not None:
+            if valid_size == 0:
+                return NumericColumn(array("d"), bytearray())
+            return NumericColumn(np.memmap(values_path, dtype=np.float64, mode="c"),
+                                 np.memmap(valid_path, dtype=bool, mode="c"))
+        with open(valid_path, "rb") as file:
+            valid = bytearray(file.read()) #one byte per row, small next to the values
+        return NumericColumn(_map_file(values_path, "d"), valid)
+    except OSError: #not cached yet
+        return None
+
+def store_cached_column(cache_dir, key, column):
+    """
+    Stores a NumericColumn in the cache as raw float64 values plus a one byte per row
+    validity mask, and removes older entries of the same file and column.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    column_id = key.split("-")[0]
+    for name in os.listdir(cache_dir): #entries of previous versions of the file are stale
+        if name.startswith(column_id + "-") and not name.startswith(key + "."):
+            os.remove(os.path.join(cache_dir, name))
+    for suffix, data in ((".valid", column.valid), (".values", column.values)): #values last, they mark the entry as complete
+        temporary_path = os.path.join(cache_dir, f"{key}{suffix}.{os.getpid()}.tmp")
+        with open(temporary_path, "wb") as file:
+            file.write(memoryview(data))
+        os.replace(temporary_path, os.path.join(cache_dir, key + suffix)) #atomic, readers never see a partial file
+
+def scan_numeric_field(buffer, start, column_index, field_count):
+    """
+    Fast path of the loaders: extracts one field of every line of raw CSV bytes and parses
+    it straight into a float buffer (float() accepts bytes), without decoding the data or
+    creating a Python string for every field. Lines are found with bytes.find and only
+    the fields up to the target one are split off, counting from the end of the line when
+    the field is in the second half of the row.
+
+    The fast path only applies to simple files: it gives up (returns None) when the data
+    holds quotes, blank lines, lone carriage returns or a row too short for the column
+    (or, when counting from the end, without exactly field_count fields), and the caller
+    then parses the data with csv.reader.
+
+    Parameters:
+        buffer (bytes or mmap): The raw data.
+        start (int): The offset of the first data line.
+        column_index (int): The index of the field to extract.
+        field_count (int): The number of fields of the header.
+
+    Returns:
+        tuple or None: The packed float64 values and the validity mask of the lines.
+
+    Raises:
+        ValueError: If a field is not numerical.
+    """
+    if buffer.find(b'"', start) != -1:
+        return None
+    from_end = column_index >= field_count // 2 #fewer fields to split off from the end of the line
+    fields_after = field_count - 1 - column_index
+    size = len(buffer)
+    values = array("d")
+    valid = bytearray()
+    position = start
+    while position < size:
+        end = buffer.find(b"\n", position)
+        if end == -1: #last line without a newline
+            end = size
+        line = buffer[position:end]
+        position = end + 1
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        if not line or b"\r" in line: #left to csv.reader
+            return None
+        if from_end:
+            if line.count(b",") != field_count - 1: #counting from the end needs the exact number of fields
+                return None
+            field = line.rsplit(b",", fields_after + 1)[-fields_after - 1]
+        else:
+            fields = line.split(b",", column_index + 1)
+            if len(fields) <= column_index: #short row
+                return None
+            field = fields[column_index]
+        if field.strip():
+            values.append(float(field))
+            valid.append(1)
+        else:
+            values.append(0.0)
+            valid.append(0)
+    return values, valid
+
+def scan_column_mmap(file_path, column_index, field_count):
+    """
+    Memory-maps a CSV file and extracts one numerical column with scan_numeric_field,
+    without decoding the file or splitting every row into a list of strings.
+
+    Returns:
+        NumericColumn or None: The column, None when the file needs csv.reader.
+
+    Raises:
+        ValueError: If the column holds a non-numerical value.
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    with mapped:
+        header_end = mapped.find(b"\n") + 1
+        if header_end == 0: #only a header
+            return None
+        scanned = scan_numeric_field(mapped, header_end, column_index, field_count)
+    if scanned is None:
+        return None
+    return NumericColumn(*scanned)
+
+def split_file(file_path, chunk_count):
+    """
+    Splits the data rows of a CSV file (after the header) into at most chunk_count byte
+    ranges of about the same size, every range starting at the beginning of a line.
+
+    Returns:
+        list of tuple: The (start, end) byte offsets of every range, in file order.
+    """
+    with open(file_path, "rb") as file:
+        file.readline() #skip the header
+        data_start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        boundaries = [data_start]
+        for chunk in range(1, chunk_count):
+            offset = data_start + (size - data_start) * chunk // chunk_count
+            if offset <= boundaries[-1]: #the previous line ran past this offset
+                continue
+            file.seek(offset - 1)
+            file.readline() #move to the start of the next line
+            if boundaries[-1] < file.tell() < size:
+                boundaries.append(file.tell())
+        boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def _has_quotes(file_path):
+    """Checks if a file contains quotes, whose fields may span lines and can't be cut anywhere"""
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped.find(b'"') != -1
+
+def _parse_chunk(file_path, start, end, column_index, field_count):
+    """
+    Worker task of the parallel loader: reads one byte range of the file and parses the
+    selected column only, with the same checks as collect_column_values.
+
+    Returns:
+        tuple: The packed float64 values and the validity mask of the rows in the range.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    scanned = scan_numeric_field(data, 0, column_index, field_count) #raw bytes fast path
+    if scanned is not None:
+        return scanned
+    values = array("d")
+    valid = bytearray()
+    for row in csv.reader(TextIOWrapper(BytesIO(data))): #decoded like open() does for the sequential loader
+        value = row[column_index] #a short row raises IndexError
+        if value.strip():
+            values.append(float(value)) #raises ValueError for a non-numerical value
+            valid.append(1)
+        else:
+            values.append(0.0)
+            valid.append(0)
+    return values, valid
+
+def load_column_parallel(file_path, column_index, workers=None):
+    """
+    Parses one column of a CSV file on several cores. The file is split into byte ranges
+    aligned on line boundaries (see split_file), each range is parsed by a worker process
+    and the parts are merged back in file order into a NumericColumn.
+
+    A quoted field containing line breaks could be cut anywhere by a range boundary, so a
+    file with any quote is not split: csv.Error is raised and the caller should use the
+    sequential loader instead.
+
+    Raises:
+        ValueError: If the column holds a non-numerical value.
+        IndexError: If a row is shorter than the column index.
+        csv.Error: If the file contains quotes.
+    """
+    if _has_quotes(file_path):
+        raise csv.Error("quoted fields may span lines, the file can't be split")
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(file_path)
+    chunk_count = max(workers * 4, size // PARALLEL_CHUNK_SIZE + 1) #a few tasks per worker to even out the load
+    chunks = split_file(file_path, chunk_count)
+    field_count = len(read_header(file_path))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_parse_chunk, [file_path] * len(chunks), [start for start, end in chunks],
+                                  [end for start, end in chunks], [column_index] * len(chunks),
+                                  [field_count] * len(chunks)))
+    values = array("d")
+    valid = bytearray()
+    for part_values, part_valid in parts: #merge in file order
+        values.extend(part_values)
+        valid.extend(part_valid)
+    return NumericColumn(values, valid)
+
+def find_column(header, column_name):
+    """
+    Returns the index of column_name in the header, the non-interactive version of check_column.
+
+    Raises:
+        ValueError: If the column doesn't exist.
+    """
+    for column in range(0, len(header)):
+        if header[column].strip() == column_name:
+            return column
+    raise ValueError(f"Column {column_name} doesn't exist")
+
+def read_header(file_path):
+    """
+    Reads only the header row of a CSV file.
+
+    Raises:
+        ValueError: If the file is empty.
+    """
+    with open(file_path, "r") as file:
+        header = next(csv.reader(file), None)
+    if header is None:
+        raise ValueError(f"{file_path} is empty")
+    return header
+
+def load_column(file_path, column_name, columnar=True, cache_dir=None, workers=1):
+    """
+    The non-interactive load stage: streams the file and collects a single numerical column.
+    With a cache_dir the parsed column is stored on disk, and a later run on the unchanged
+    file memory-maps it instead of parsing the CSV again. With more than one worker a
+    columnar load parses the file in parallel (see load_column_parallel), with one worker
+    it scans the memory-mapped file (see scan_column_mmap) unless csv.reader is needed.
+
+    Returns:
+        NumericColumn or list: The column, a NumericColumn when columnar is set.
+
+    Raises:
+        ValueError: If the column doesn't exist or is not numerical.
+    """
+    if columnar and cache_dir is not None:
+        key = column_cache_key(file_path, column_name)
+        cached_column = load_cached_column(cache_dir, key)
+        if cached_column is not None: #no csv parsing at all
+            return cached_column
+    header = read_header(file_path)
+    column_index = find_column(header, column_name)
+    rows = CsvRowStream(file_path) #rows are streamed, never held in memory
+    try:
+        if columnar:
+            column_values = None
+            if workers != 1:
+                try:
+                    column_values = load_column_parallel(file_path, column_index, workers)
+                except csv.Error: #line breaks inside quoted fields, parse sequentially
+                    pass
+            else:
+                column_values = scan_column_mmap(file_path, column_index, len(header))
+            if column_values is None:
+                column_values = NumericColumn.from_strings(iter_column(rows, column_index))
+            if cache_dir is not None:
+                try:
+                    store_cached_column(cache_dir, key, column_values)
+                except OSError as error: #a read only cache only costs speed
+                    print(f"Could not cache column: {error}")
+            return column_values
+        column_values = []
+        for value in iter_column(rows, column_index):
+            if value.strip():
+                float(value) #raises ValueError for a non-numerical value
+            column_values.append(value)
+        return column_values
+    except (ValueError, IndexError):
+        raise ValueError(f"Column {column_name} is not numerical") from None
+
+def _head_digest(file_path, length):
+    """Returns a hash of the first length bytes of a file"""
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read(length)).hexdigest()
+
+def _merge_sorted_file(old_path, new_values, new_path):
+    """
+    Writes the sorted float64 file at old_path merged with the sorted new_values to new_path.
+    The position of every new value is found with a binary search in the memory-mapped old
+    file, and the old values between two positions are copied as one block of bytes, so the
+    work done in Python depends on the number of new values only.
+    """
+    old_values = _map_file(old_path, "d") if old_path and os.path.exists(old_path) else array("d")
+    old_bytes = memoryview(old_values).cast("B")
+    with open(new_path, "wb") as file:
+        previous = 0
+        for value in new_values:
+            position = bisect.bisect_right(old_values, value, previous)
+            file.write(old_bytes[previous * 8:position * 8]) #block copy of the old values before this one
+            file.write(struct.pack("d", value))
+            previous = position
+        file.write(old_bytes[previous * 8:])
+
+def analyze_incremental(file_path, column_name, state_dir=STATE_DIR):
+    """
+    Incremental analysis of an append-only CSV file. The byte offset reached, the statistics
+    and the sorted values of the column are kept in state_dir. A later run parses only the
+    complete rows appended since then, updates the statistics and merges the new sorted
+    values into the stored sorted column instead of sorting everything again. If the file
+    was truncated or rewritten (its first bytes changed) the state is rebuilt from scratch.
+    Empty cells are counted as missing and are not part of the sorted column.
+
+    Returns:
+        tuple: The ColumnStats, the sorted values (a memory-mapped array of floats) and the
+        number of rows parsed by this run.
+
+    Raises:
+        ValueError: If the column doesn't exist or holds a non-numerical value.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    state_id = column_cache_key(file_path, column_name).split("-")[0] #the file path and column only, the file is expected to change
+    state_path = os.path.join(state_dir, state_id + ".json")
+    state = None
+    if os.path.exists(state_path):
+        with open(state_path, "r") as file:
+            state = json.load(file)
+        size = os.path.getsize(file_path)
+        if size < state["offset"] or _head_digest(file_path, state["check_length"]) != state["check_digest"]:
+            if state["sorted_file"]: #the sorted column of the old file is of no use anymore
+                try:
+                    os.remove(os.path.join(state_dir, state["sorted_file"]))
+                except FileNotFoundError:
+                    pass
+            state = None #the file is not the one the state was built from
+    if state is None: #first run, start right after the header
+        header = read_header(file_path)
+        with open(file_path, "rb") as file:
+            file.readline()
+            offset = file.tell()
+        state = {"offset": offset, "column_index": find_column(header, column_name), "generation": 0,
+                 "stats": ColumnStats().to_dict(), "sorted_file": None}
+    stats = ColumnStats.from_dict(state["stats"])
+
+    with open(file_path, "rb") as file:
+        file.seek(state["offset"])
+        data = file.read()
+    data = data[:data.rfind(b"\n") + 1] #a last line without a newline may still be being written
+    new_values = []
+    rows = 0
+    try:
+        for row in csv.reader(TextIOWrapper(BytesIO(data))):
+            rows += 1
+            value = row[state["column_index"]]
+            if value.strip():
+                number = float(value)
+                stats.add(number)
+                new_values.append(number)
+            else:
+                stats.add_missing()
+    except (ValueError, IndexError):
+        raise ValueError(f"Column {column_name} is not numerical") from None
+    new_values.sort() #only the new rows are sorted
+
+    old_sorted_path = os.path.join(state_dir, state["sorted_file"]) if state["sorted_file"] else None
+    if new_values or old_sorted_path is None:
+        state["generation"] += 1
+        state["sorted_file"] = f"{state_id}.{state['generation']}.sorted"
+        _merge_sorted_file(old_sorted_path, new_values, os.path.join(state_dir, state["sorted_file"]))
+    state["offset"] += len(data)
+    state["check_length"] = min(state["offset"], STATE_CHECK_SIZE)
+    state["check_digest"] = _head_digest(file_path, state["check_length"])
+    state["stats"] = stats.to_dict()
+    temporary_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(state, file)
+    os.replace(temporary_path, state_path) #the new state only takes effect once it is complete
+    if old_sorted_path is not None and old_sorted_path != os.path.join(state_dir, state["sorted_file"]):
+        os.remove(old_sorted_path)
+    return stats, _map_file(os.path.join(state_dir, state["sorted_file"]), "d"), rows
+
+def run_headless(file_path, options):
+    """
+    Runs the load, clean, analyze and visualize stages on one file without any prompt,
+    using the parsed command line options. Returns True if the file was processed.
+    """
+    print(f"File: {file_path}")
+    profiler = StageProfiler(options.profile, options.profile_out, options.profile_capture,
+                             options.profile_dir, file_path)
+    try:
+        if options.chart == "stream": #one pass over the file, the column is never held in memory
+            with profiler.stage("stream") as record:
+                edges, counts, stats = stream_column_histogram(file_path, options.column, options.fill, options.bins)
+                record["rows"] = stats.count + stats.missing
+            print(stats)
+            print(f"Column: {options.column}")
+            print(f"Approximate histogram: {len(counts)} bins\n")
+            render_histogram(edges, counts)
+            profiler.report()
+            return True
+        if options.incremental: #only the rows appended since the last run are parsed
+            with profiler.stage("incremental") as record:
+                stats, sorted_values, rows = analyze_incremental(file_path, options.column, options.state_dir)
+                record["rows"] = rows
+            print(f"Parsed {rows} new rows")
+            print(stats)
+            if len(sorted_values):
+                middle = len(sorted_values) // 2
+                median = sorted_values[middle] if len(sorted_values) % 2 else (sorted_values[middle - 1] + sorted_values[middle]) / 2
+                print(f"Median: {median}")
+            profiler.report()
+            return True
+        if options.all_columns: #batch mode, every numerical column of the file
+            with profiler.stage("all_columns") as record:
+                header = read_header(file_path)
+                summaries = analyze_all_columns(CsvRowStream(file_path), header, options.fill,
+                                                options.order == "desc", options.column_workers)
+                if summaries:
+                    stats, median = next(iter(summaries.values()))
+                    record["rows"] = stats.count + stats.missing
+            print_batch_summary(summaries)
+            profiler.report()
+            return True
+        with profiler.stage("load") as record:
+            print("\nStage 1: Load Data")
+            column_values = load_column(file_path, options.column, cache_dir=options.cache_dir,
+                                        workers=options.load_workers)
+            print("Data Loaded Successfully")
+            record["rows"] = rows = len(column_values)
+        stats_key = (file_path, options.column) #files processed in the same process don't share statistics
+        with profiler.stage("clean") as record:
+            cleaned_column_values = clean(column_values, stats_key, FILL_CHOICES[options.fill], options.echo)
+            record["rows"] = rows
+        with profiler.stage("analyze") as record:
+            sorted_column_values = analyze(cleaned_column_values, stats_key, ORDER_CHOICES[options.order], options.echo)
+            record["rows"] = rows
+        with profiler.stage("visualize") as record:
+            visualize(sorted_column_values, options.column, options.chart, options.bins)
+            record["rows"] = rows
+        profiler.report()
+        return True
+    except (OSError, ValueError) as error: #report the problem and carry on with the other files
+        print(f"Error: {error}")
+        return False
+
+def _run_headless_captured(file_path, options):
+    """Runs run_headless in a worker process and returns its status and output"""
+    output = StringIO()
+    with redirect_stdout(output):
+        succeeded = run_headless(file_path, options)
+    return succeeded, output.getvalue()
+
+def _summarize_file(file_path, column_name):
+    """Worker task of the --summary mode, returns the summary as a dictionary or the error message"""
+    try:
+        return summarize_stream(file_path, column_name).to_dict(), None
+    except (OSError, ValueError) as error:
+        return None, str(error)
+
+def main_summary(options):
+    """
+    The --summary mode: summarizes the column of every matching file (concurrently when there
+    are several), merges the summaries together with the ones given with --merge-summary and
+    optionally saves the result with --save-summary.
+
+    Returns:
+        int: The exit status, 0 if every file was summarized, 1 otherwise.
+    """
+    file_paths = sorted(glob.glob(options.file)) or [options.file]
+    profiler = StageProfiler(options.profile, options.profile_out, options.profile_capture,
+                             options.profile_dir, options.file)
+    with profiler.stage("summary") as record:
+        with ProcessPoolExecutor(max_workers=options.workers) as executor:
+            results = list(executor.map(_summarize_file, file_paths, [options.column] * len(file_paths)))
+        record["rows"] = sum(data["stats"]["count"] + data["stats"]["missing"] for data, error in results if data is not None)
+    combined = StreamingSummary()
+    succeeded = True
+    for file_path, (data, error) in zip(file_paths, results):
+        print(f"File: {file_path}")
+        if error is not None:
+            print(f"Error: {error}")
+            succeeded = False
+            continue
+        summary = StreamingSummary.from_dict(data)
+        print(summary)
+        combined.merge(summary)
+    for summary_path in options.merge_summary: #summaries of earlier runs over other partitions
+        with open(summary_path, "r") as file:
+            combined.merge(StreamingSummary.from_dict(json.load(file)))
+    if len(file_paths) + len(options.merge_summary) > 1:
+        print("\nCombined summary:")
+        print(combined)
+    if options.save_summary:
+        with open(options.save_summary, "w") as file:
+            json.dump(combined.to_dict(), file)
+    profiler.report()
+    return 0 if succeeded else 1
+
+def parse_arguments(argv):
+    """Parses the command line options of the headless mode"""
+    parser = argparse.ArgumentParser(description="Data Analysis CLI. Runs interactively when --file is not given.")
+    parser.add_argument("--file", help="path to the csv file, a glob pattern processes every matching file")
+    parser.add_argument("--column", help="name of the numerical column to analyse")
+    parser.add_argument("--all-columns", action="store_true", help="analyse every numerical column of the file")
+    parser.add_argument("--fill", choices=FILL_CHOICES, default="avg", help="value used to replace empty cells")
+    parser.add_argument("--order", choices=ORDER_CHOICES, default="asc", help="sorting order")
+    parser.add_argument("--no-echo", dest="echo", action="store_false", help="don't print the column values")
+    parser.add_argument("--preview-rows", type=int, default=PREVIEW_ROWS,
+                        help="rows echoed when the file is opened interactively")
+    parser.add_argument("--no-stream", dest="stream", action="store_false",
+                        help="load and echo every row of the file in interactive mode instead of streaming it")
+    parser.add_argument("--workers", type=int, default=None, help="number of files processed at the same time")
+    parser.add_argument("--column-workers", type=int, default=1, help="processes per file in --all-columns mode")
+    parser.add_argument("--chart", choices=["stars"] + HISTOGRAM_MODES + ["stream"], default="stars",
+                        help="one line of stars per value, a histogram with fixed, quantile or log bins, "
+                             "or an approximate histogram streamed from the file")
+    parser.add_argument("--bins", type=int, default=HISTOGRAM_BINS, help="number of histogram bins")
+    parser.add_argument("--summary", action="store_true",
+                        help="stream approximate quantiles and top/bottom values of the column instead of sorting it")
+    parser.add_argument("--save-summary", help="save the combined --summary to this JSON file")
+    parser.add_argument("--merge-summary", action="append", default=[],
+                        help="merge a summary saved with --save-summary, can be repeated")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only parse the rows appended since the last --incremental run of this file and column")
+    parser.add_argument("--state-dir", default=STATE_DIR, help="directory of the --incremental state")
+    parser.add_argument("--load-workers", type=int, default=1,
+                        help="processes parsing each file, 0 uses one per CPU")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the parsed column cache")
+    parser.add_argument("--no-cache", dest="cache_dir", action="store_const", const=None, help="always parse the csv file")
+    parser.add_argument("--profile", action="store_true",
+                        help="measure wall time, CPU time, rows per second and peak RSS of every stage")
+    parser.add_argument("--profile-out", help="append the --profile measurements to this JSON lines file")
+    parser.add_argument("--profile-capture", choices=["cprofile", "tracemalloc"],
+                        help="also capture a cProfile or tracemalloc report of the slowest stage")
+    parser.add_argument("--profile-dir", default=".", help="directory where the capture of the slowest stage is written")
+    options = parser.parse_args(argv)
+    if options.profile_out or options.profile_capture:
+        options.profile = True
+    if options.file is not None and options.column is None and not options.all_columns:
+        parser.error("--column or --all-columns is required with --file")
+    if (options.chart == "stream" or options.summary or options.incremental) and options.column is None:
+        parser.error("--chart stream, --summary and --incremental need a --column")
+    return options
+
+def main_headless(options):
+    """
+    Processes every file matching options.file. Several files are processed concurrently
+    in worker processes, and their output is printed in file order.
+
+    Returns:
+        int: The exit status, 0 if every file was processed, 1 otherwise.
+    """
+    file_paths = sorted(glob.glob(options.file)) or [options.file] #a plain path that doesn't exist is reported as an error
+    if len(file_paths) == 1 or options.workers == 1:
+        results = [run_headless(file_path, options) for file_path in file_paths]
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=options.workers) as executor:
+            for succeeded, output in executor.map(_run_headless_captured, file_paths, [options] * len(file_paths)):
+                print(output, end="") #print each file's output in one piece
+                results.append(succeeded)
+    return 0 if all(results) else 1
+
+def main(argv=None):
     """
     The main function handles the operations of the Data Analysis Command Line Interface (CLI).
 
@@ -361,17 +2069,35 @@ def main():
 
     Each step is executed in order, and the outputs from one step are passed as inputs to the next,
     a typical data processing pipeline in a CLI environment.
+
+    When a --file is given on the command line the same pipeline runs without any prompt
+    (see parse_arguments for the options) and the exit status is returned.
     """
+    options = parse_arguments(argv)
+    if options.file is not None and options.summary: #streaming summary stage only
+        return main_summary(options)
+    if options.file is not None: #headless mode
+        return main_headless(options)
+    profiler = StageProfiler(options.profile, options.profile_out, options.profile_capture, options.profile_dir)
     #Display main program menu
     welcome() 
     #Load Data
-    column_values, column_name = load()
+    with profiler.stage("load") as record: #wall times include the time spent answering the prompts
+        column_values, column_name = load(options.stream, options.preview_rows)
+        record["rows"] = rows = len(column_values)
     #Clean and prepare 
-    cleaned_column_values = clean(column_values) #pass column values from load data to be cleaned and return the clean column values
+    with profiler.stage("clean") as record:
+        cleaned_column_values = clean(column_values, column_name) #pass column values from load data to be cleaned and return the clean column values
+        record["rows"] = rows
     #Analyze
-    sorted_column_values = analyze(cleaned_column_values) #pass the cleaned column values to sort them and return the sorted list
+    with profiler.stage("analyze") as record:
+        sorted_column_values = analyze(cleaned_column_values, column_name) #pass the cleaned column values to sort them and return the sorted list
+        record["rows"] = rows
     #Visualize
-    visualize(sorted_column_values, column_name) #pass the sorted column values to visualize the data for better understanding
+    with profiler.stage("visualize") as record:
+        visualize(sorted_column_values, column_name) #pass the sorted column values to visualize the data for better understanding
+        record["rows"] = rows
+    profiler.report()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Contributers: InterWorldKid
+
+This module benchmarks the stages of the Data Analysis CLI (Data_Analysis.py). It generates
+synthetic CSV files of different sizes and widths, with a configurable fraction of empty cells,
+then times every stage of the pipeline with the input prompts stubbed out:
+
+1- open_file and collect_column_values (loading)
+2- get_max, get_min, get_avrg and replace_empty_values (cleaning)
+3- sort_column_values in ascending and descending order (analysis)
+4- visualize (visualization, printed to a null device)
+5- the other load paths: the streamed rows, the columnar parse, the memory-mapped scan and
+   the parsed column cache (stored then loaded back), with the columnar clean and sort
+
+For each stage the wall time, the throughput in rows per second and the peak memory
+(tracemalloc) are reported. The results can be saved as a baseline and later runs compared
+with it so that performance regressions are caught.
+
+Example:
+    python Data_Analysis_Benchmark.py --rows 1000,100000 --columns 3,100 --save-baseline baseline.json
+    python Data_Analysis_Benchmark.py --rows 1000,100000 --columns 3,100 --baseline baseline.json
+
+"""
+
+
+import argparse #import argparse to parse the benchmark options
+import builtins #import builtins to stub the input prompts
+import functools #import functools to pass the rows to a stage without a closure
+import json #import json to save and compare baselines
+import os #import os to remove the generated files and reach the null device
+import random #import random to generate the synthetic data
+import sys #import sys to return the exit status
+import tempfile #import tempfile to store the generated files
+import time #import time to measure the stages
+import tracemalloc #import tracemalloc to measure the peak memory of the stages
+from contextlib import contextmanager, redirect_stdout #import helpers to stub prompts and silence output
+
+import Data_Analysis #the module being measured
+
+DEFAULT_ROWS = "1000,10000,100000" #row counts benchmarked by default, up to 10M can be given
+DEFAULT_COLUMNS = "3,100" #narrow and wide files
+DEFAULT_EMPTY_FRACTION = 0.1 #fraction of empty cells in the analysed column
+REGRESSION_TOLERANCE = 0.2 #a stage is reported as a regression when 20% slower than its baseline
+
+def generate_csv(file_path, rows, columns, empty_fraction, seed=0):
+    """
+    Writes a synthetic CSV file with one header row and rows data rows. The first column
+    is the analysed one: random numbers between 0 and 200 with empty_fraction empty cells.
+    The other columns hold numbers and short labels so wide files look like real exports.
+    """
+    generator = random.Random(seed)
+    with open(file_path, "w") as file:
+        file.write(",".join(["value"] + [f"column{index}" for index in range(1, columns)]) + "\n")
+        filler = ",".join(str(index) if index % 2 else f"label{index}" for index in range(1, columns)) #the other cells
+        for row in range(rows):
+            if generator.random() < empty_fraction:
+                value = ""
+            else:
+                value = f"{generator.uniform(0, 200):.3f}"
+            file.write(f"{value},{filler}\n" if columns > 1 else f"{value}\n")
+
+@contextmanager
+def stub_input(answers):
+    """Replaces input() with a function returning the given answers in order"""
+    replies = iter(answers)
+    original_input = builtins.input
+    builtins.input = lambda prompt="": next(replies)
+    try:
+        yield
+    finally:
+        builtins.input = original_input
+
+def measure(function, track_memory):
+    """
+    Runs function once with its output sent to the null device.
+
+    Returns:
+        tuple: The result of the function, the wall time in seconds and the peak memory in bytes (None if not tracked).
+    """
+    with open(os.devnull, "w") as null_device, redirect_stdout(null_device):
+        if track_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        peak = None
+        if track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+def benchmark_file(file_path, rows, track_memory):
+    """
+    Times every stage of the pipeline on one generated file.
+
+    Returns:
+        dict: The stage name mapped to its wall time, rows per second and peak memory.
+    """
+    results = {}
+
+    def record(stage, function):
+        """Measures one stage and stores its numbers"""
+        result, elapsed, peak = measure(function, track_memory)
+        results[stage] = {"seconds": elapsed, "rows_per_second": rows / elapsed if elapsed else None,
+                          "peak_memory": peak}
+        return result
+
+    def open_stubbed():
+        """open_file with the path typed in by the stub, every row loaded in memory"""
+        with stub_input([file_path]):
+            return Data_Analysis.open_file(stream=False)
+
+    data_list, header = record("open_file", open_stubbed)
+    column_values = record("collect_column_values", functools.partial(Data_Analysis.collect_column_values, data_list, 0, header))
+    del data_list #only the column is needed from now on
+    record("get_max", lambda: Data_Analysis.get_max(column_values))
+    record("get_min", lambda: Data_Analysis.get_min(column_values))
+    average = record("get_avrg", lambda: Data_Analysis.get_avrg(column_values))
+    record("replace_empty_values", lambda: Data_Analysis.replace_empty_values(column_values, average))
+    descending_values = list(column_values)
+    record("sort_ascending", lambda: Data_Analysis.sort_column_values(column_values))
+    record("sort_descending", lambda: Data_Analysis.sort_column_values(descending_values, descending=True))
+    record("visualize", lambda: Data_Analysis.visualize(column_values, "value"))
+    column_values = descending_values = None #free the columns before the other load paths
+
+    rows_stream = Data_Analysis.CsvRowStream(file_path)
+    record("stream_collect", lambda: Data_Analysis.collect_column_values(rows_stream, 0, header))
+    record("columnar_collect", lambda: Data_Analysis.collect_column_values(rows_stream, 0, header, columnar=True))
+    column = record("mmap_scan", lambda: Data_Analysis.load_column(file_path, "value"))
+    average = Data_Analysis.get_avrg(column)
+    record("columnar_replace", lambda: Data_Analysis.replace_empty_values(column, average))
+    record("columnar_sort", lambda: Data_Analysis.sort_column_values(column))
+    column = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        record("cache_store", lambda: Data_Analysis.load_column(file_path, "value", cache_dir=cache_dir))
+        record("cache_load", lambda: len(Data_Analysis.load_column(file_path, "value", cache_dir=cache_dir)))
+    return results
+
+def run_benchmarks(row_counts, column_counts, empty_fraction, track_memory):
+    """
+    Generates every combination of row and column counts and benchmarks it.
+
+    Returns:
+        dict: Results keyed by "<rows>x<columns>", then by stage.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in row_counts:
+            for columns in column_counts:
+                file_path = os.path.join(directory, f"bench_{rows}x{columns}.csv")
+                generate_csv(file_path, rows, columns, empty_fraction)
+                results[f"{rows}x{columns}"] = benchmark_file(file_path, rows, track_memory)
+                os.remove(file_path) #large files are not kept around
+    return results
+
+def compare_with_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compares the throughput of every stage with the baseline.
+
+    Returns:
+        list of str: A message for every stage slower than the baseline by more than tolerance.
+    """
+    regressions = []
+    for case, stages in results.items():
+        for stage, numbers in stages.items():
+            previous = baseline.get(case, {}).get(stage)
+            if not previous or not previous["rows_per_second"] or not numbers["rows_per_second"]:
+                continue #not measured in the baseline
+            ratio = numbers["rows_per_second"] / previous["rows_per_second"]
+            if ratio < 1 - tolerance:
+                regressions.append(f"{case} {stage}: {ratio:.0%} of the baseline throughput")
+    return regressions
+
+def print_results(results):
+    """Displays one line per case and stage"""
+    print(f"{'case':<14}{'stage':<24}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+    for case, stages in results.items():
+        for stage, numbers in stages.items():
+            peak = "" if numbers["peak_memory"] is None else f"{numbers['peak_memory'] / 1e6:.1f}"
+            throughput = "" if numbers["rows_per_second"] is None else f"{numbers['rows_per_second']:,.0f}"
+            print(f"{case:<14}{stage:<24}{numbers['seconds']:>10.4f}{throughput:>14}{peak:>10}")
+
+def parse_arguments(argv):
+    """Parses the benchmark options"""
+    parser = argparse.ArgumentParser(description="Benchmark the Data Analysis CLI stages.")
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help="comma separated row counts")
+    parser.add_argument("--columns", default=DEFAULT_COLUMNS, help="comma separated column counts (narrow and wide files)")
+    parser.add_argument("--empty-fraction", type=float, default=DEFAULT_EMPTY_FRACTION, help="fraction of empty cells")
+    parser.add_argument("--no-memory", dest="track_memory", action="store_false",
+                        help="don't track peak memory (tracemalloc slows the stages down)")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", help="save the results as the baseline in this JSON file")
+    parser.add_argument("--baseline", help="compare the results with the baseline in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="allowed slowdown before a regression is reported")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Runs the benchmarks, prints the results, saves them if asked and compares them with
+    the baseline. Returns 1 if a regression was found, 0 otherwise.
+    """
+    options = parse_arguments(argv)
+    row_counts = [int(rows) for rows in options.rows.split(",")]
+    column_counts = [int(columns) for columns in options.columns.split(",")]
+    results = run_benchmarks(row_counts, column_counts, options.empty_fraction, options.track_memory)
+    print_results(results)
+    for output_path in (options.json, options.save_baseline):
+        if output_path:
+            with open(output_path, "w") as file:
+                json.dump(results, file, indent=2)
+    if options.baseline:
+        with open(options.baseline, "r") as file:
+            regressions = compare_with_baseline(results, json.load(file), options.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+        print("No regression against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,25 +9,1422 @@ displaying the cart's contents, and checking out with automatic VAT and discount
 calculations. The system reads inventory data from a CSV file, which populates an 
 INVENTORY dictionary with product details such as name, quantity available, and price.
 
+The inventory is pluggable: INVENTORY is an in memory MemoryInventory by default, and
+can be replaced (see set_inventory) by a SQLiteInventory for large catalogues, which keeps
+the products in an indexed SQLite database and writes stock updates transactionally, or by
+an ArrayInventory, which keeps the quantities and prices in compact arrays updated in place.
+
+Checkout prices carts with a PricingEngine working in integer cents and basis points
+(1/100 of a percent), so totals are exact and rounded once. Its rules are pluggable
+(TieredDiscount, VatRule) and it prices whole batches of carts, e.g. a day of orders.
+
+Menu option 1 browses the catalogue a page at a time and searches it through a
+CatalogueIndex (sorted names for prefix search, trigrams for fuzzy search).
+
+With --journal every stock and cart change is appended to a write-ahead journal
+(InventoryJournal) with batched fsyncs, and compact snapshots are taken periodically, so
+a crashed session is recovered from the latest snapshot and the journal tail.
+
+With --replay a file of orders (CSV or JSON lines) is replayed with the cart rules at high
+throughput, for capacity testing (see replay_orders).
+
+With --serve the carts are hosted by an asyncio TCP server (ShoppingServer) instead of the
+interactive menu, one session per customer, speaking JSON lines.
+
 """
+import argparse #import argparse to parse the command line options
+import array #import array for the compact postings of the search index
+import asyncio #import asyncio for the server mode
+import bisect #import bisect to find the discount tier of a quantity
+import concurrent.futures #import concurrent.futures to parse large product files in parallel
 import csv #import csv file
+import heapq #import heapq to find the reservations that expire first
+import io #import io to capture the cart messages sent to server clients
+import itertools #import itertools to number the reservations
+import json #import json for the server protocol and the journal
+import math #import math to reject prices that are not finite
+import mmap #import mmap to look for quotes in large product files
+import os #import os to fsync the journal and replace the snapshots atomically
+import secrets #import secrets to name the server sessions
+import sqlite3 #import sqlite3 for the database inventory backend
+import threading #import threading for the locks of the reservation engine
+import time #import time to expire reservations
+from collections import OrderedDict #import OrderedDict to keep the server sessions by last use
+from collections.abc import MutableMapping #import MutableMapping to give the database backend a dictionary interface
+from contextlib import contextmanager, nullcontext, redirect_stdout #import helpers for the journal groups and the cart messages
+from decimal import ROUND_HALF_UP, Decimal #import Decimal to convert prices to exact cents
+from functools import lru_cache #import lru_cache to convert every price to cents once
 
-INVENTORY = {} #create a global dictionary for the inventory
 VAT_RATE = 0.07 #7% overall VAT
 DISCOUNT_RATE = 0.1 #10% discount on+ 3 items or more for a product
+DISCOUNT_MIN_QUANTITY = 4 #the discount applies from this quantity of a product
+CENTS = 100 #cents per currency unit
+BASIS_POINTS = 10000 #basis points per unit, rates are integers in basis points (700 = 7%)
+DISPLAY_LIMIT = 1000 #larger database inventories are abbreviated when printed
+SEARCH_LIMIT = 20 #default number of products returned by a search
+PAGE_SIZE = 20 #products shown per page when browsing the catalogue
+FUZZY_CANDIDATES = 1000 #most products scored by a fuzzy search
+IMPORT_BATCH_SIZE = 10000 #rows inserted per executemany call when importing a csv file in the database
+LOAD_ERROR_LIMIT = 1000 #rejected rows kept in the load report, all of them are counted
+PARALLEL_LOAD_THRESHOLD = 64 * 1024 * 1024 #product files from this size are parsed by a process pool
+BACKGROUND_LOAD_THRESHOLD = 8 * 1024 * 1024 #product files from this size load in the background in the menu
+LOAD_NOTIFY_EVERY = 1000 #products loaded between two wake ups of the lookups waiting for the loader
+RESERVATION_TTL = 15 * 60 #seconds a reservation holds its stock before it expires back into the inventory
+JOURNAL_FSYNC_BATCH = 64 #journal records written between two fsyncs
+JOURNAL_FSYNC_INTERVAL = 0.05 #seconds after which pending journal records are fsynced anyway
+SNAPSHOT_EVERY = 10000 #journal records between two snapshots
+REPLAY_BATCH_SIZE = 10000 #order operations between two batched inventory updates
+SERVER_HOST = "127.0.0.1" #the server only listens locally by default
+SERVER_PORT = 8765 #default port of the server mode
+SESSION_IDLE_TIMEOUT = 5 * 60 #seconds before an idle server session is evicted and its stock released
+
+class InventoryMixin:
+    """
+    The methods shared by the in memory inventory backends, written on top of the
+    dictionary interface and adjustStock of the backend.
+
+    Methods:
+        adjustStockBatch: Applies many stock changes at once
+        searchPrefix: Lists the products whose name starts with a prefix
+        searchName: Lists the products whose name contains a text
+    """
+
+    def adjustStockBatch(self, changes):
+        """Applies a product name -> change dictionary, returns the names whose change was refused"""
+        return [name for name, change in changes.items() if not self.adjustStock(name, change)]
+
+    def searchPrefix(self, prefix, limit=SEARCH_LIMIT):
+        """Returns up to limit (name, quantity, price) tuples whose name starts with prefix, sorted by name"""
+        names = sorted(name for name in self if name.startswith(prefix))[:limit]
+        return [(name,) + self[name] for name in names]
+
+    def searchName(self, text, limit=SEARCH_LIMIT):
+        """Returns up to limit (name, quantity, price) tuples whose name contains text (ignoring case), sorted by name"""
+        text = text.lower()
+        names = sorted(name for name in self if text in name.lower())[:limit]
+        return [(name,) + self[name] for name in names]
+
+class MemoryInventory(InventoryMixin, dict):
+    """
+    The default inventory backend: a dictionary of product names mapped to
+    (quantity, price) tuples, held in memory.
+
+    Every inventory backend behaves like this dictionary and also offers:
+    adjustStock: Adds a (possibly negative) amount to the stock of a product
+    adjustStockBatch: Applies many stock changes at once
+    searchPrefix: Lists the products whose name starts with a prefix
+    searchName: Lists the products whose name contains a text
+    """
+
+    def adjustStock(self, name, change):
+        """Adds change to the stock of a product, returns False if the product is missing or the stock would go negative"""
+        if name not in self:
+            return False
+        quantity, price = self[name]
+        if quantity + change < 0:
+            return False
+        self[name] = (quantity + change, price)
+        return True
+
+class ArrayInventory(InventoryMixin, MutableMapping):
+    """
+    Compact in memory inventory backend. The quantities and the prices (in integer cents)
+    live in two parallel array('q') columns, and a dictionary maps every product name to
+    its slot in the columns. A product costs two 8 byte cells instead of a tuple, an int
+    and a float, and stock changes through adjustStock write the column in place without
+    creating any object. Reading a product still returns a (quantity, price) tuple, with
+    the price back in currency units, so it works everywhere a MemoryInventory does.
+    Slots of removed products are reused.
+    """
+
+    def __init__(self, products=None):
+        """Creates the inventory, optionally filled from a name -> (quantity, price) mapping"""
+        self.slots = {} #product name -> slot in the columns
+        self.quantities = array.array("q")
+        self.prices = array.array("q") #in cents
+        self._free = [] #slots of removed products
+        if products:
+            for name, quantity_price in products.items():
+                self[name] = quantity_price
+
+    def __getitem__(self, name):
+        """Returns (quantity, price) of a product, raises KeyError if it doesn't exist"""
+        slot = self.slots[name]
+        return self.quantities[slot], self.prices[slot] / CENTS
+
+    def __setitem__(self, name, quantity_price):
+        """Adds or replaces a product, raises ValueError if the price has a fraction of a cent"""
+        quantity, price = quantity_price
+        if not is_whole_cents(price): #it would be stored rounded
+            raise ValueError(f"The price of {name} ({price}) has a fraction of a cent")
+        cents = to_cents(price)
+        slot = self.slots.get(name)
+        if slot is not None: #existing product, the cells are overwritten in place
+            self.quantities[slot] = quantity
+            self.prices[slot] = cents
+            return
+        if self._free:
+            slot = self._free.pop()
+            self.quantities[slot] = quantity
+            self.prices[slot] = cents
+        else:
+            slot = len(self.quantities)
+            self.quantities.append(quantity)
+            self.prices.append(cents)
+        self.slots[name] = slot #registered last, a concurrent lookup never sees the slot before its cells
+
+    def __delitem__(self, name):
+        """Removes a product, raises KeyError if it doesn't exist"""
+        slot = self.slots.pop(name)
+        self.quantities[slot] = 0
+        self._free.append(slot)
+
+    def __contains__(self, name):
+        """Checks if a product exists"""
+        return name in self.slots
+
+    def __iter__(self):
+        """Iterates over the product names"""
+        return iter(self.slots)
+
+    def __len__(self):
+        """Returns the number of products"""
+        return len(self.slots)
+
+    def adjustStock(self, name, change):
+        """Adds change to the stock of a product in place, returns False if the product is missing or the stock would go negative"""
+        slot = self.slots.get(name)
+        if slot is None or self.quantities[slot] + change < 0:
+            return False
+        self.quantities[slot] += change
+        return True
+
+    def __repr__(self):
+        """Shows the inventory like a dictionary, abbreviated when large"""
+        if len(self) > DISPLAY_LIMIT:
+            items = {name: self[name] for name in itertools.islice(self.slots, DISPLAY_LIMIT)}
+            return f"{items!r} ... ({len(self)} products)"
+        return repr({name: self[name] for name in self.slots})
+
+class SQLiteInventory(MutableMapping):
+    """
+    An inventory backend storing the products in a SQLite database, for catalogues too
+    large to load in memory. Nothing is loaded at start up: each lookup is a query on the
+    primary key index, and each stock update is its own transaction, so the stock on disk
+    is always consistent and survives the end of the program.
+
+    It behaves like the dictionary of MemoryInventory (name -> (quantity, price)).
+
+    Methods:
+        importRows: Loads many products in the database in one transaction
+        pageNames: Lists the product names of one page, in order
+        adjustStock: Adds a (possibly negative) amount to the stock of a product
+        adjustStockBatch: Applies many stock changes in one transaction
+        searchPrefix: Lists the products whose name starts with a prefix (uses the index)
+        searchName: Lists the products whose name contains a text
+        close: Closes the database
+    """
+
+    def __init__(self, db_path):
+        """Opens (and creates if needed) the database at db_path"""
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.RLock() #the connection is shared between threads, one transaction at a time
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL") #readers are not blocked by stock updates
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "name TEXT PRIMARY KEY, quantity INTEGER NOT NULL, price REAL NOT NULL) WITHOUT ROWID")
+
+    def importRows(self, rows):
+        """
+        Streams (name, quantity, price) rows into the database in one transaction,
+        replacing products with the same name.
+        """
+        with self.lock, self.connection:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self.connection.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?)", batch)
+                    batch = []
+            self.connection.executemany("INSERT OR REPLACE INTO products VALUES (?, ?, ?)", batch)
+
+    def isEmpty(self):
+        """Checks if the database holds no product, without counting them"""
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM products LIMIT 1").fetchone() is None
+
+    def __getitem__(self, name):
+        """Returns the (quantity, price) of a product, raises KeyError if it doesn't exist"""
+        with self.lock:
+            row = self.connection.execute("SELECT quantity, price FROM products WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row
+
+    def __setitem__(self, name, quantity_price):
+        """Adds or replaces a product with a (quantity, price) tuple in its own transaction"""
+        quantity, price = quantity_price
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO products VALUES (?, ?, ?)", (name, quantity, price))
+
+    def __delitem__(self, name):
+        """Removes a product, raises KeyError if it doesn't exist"""
+        with self.lock, self.connection:
+            if self.connection.execute("DELETE FROM products WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+
+    def __contains__(self, name):
+        """Checks if a product exists with an index lookup"""
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM products WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self):
+        """Yields the product names in order, fetched lazily from the database"""
+        with self.lock:
+            cursor = self.connection.cursor() #a cursor of its own, other queries can run while iterating
+        for (name,) in cursor.execute("SELECT name FROM products ORDER BY name"):
+            yield name
+
+    def __len__(self):
+        """Returns the number of products"""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def adjustStock(self, name, change):
+        """
+        Adds change to the stock of a product in one transaction. The stock never goes
+        negative: returns False (and changes nothing) if the product is missing or the
+        stock is too low.
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "UPDATE products SET quantity = quantity + ? WHERE name = ? AND quantity + ? >= 0",
+                (change, name, change))
+        return cursor.rowcount == 1
+
+    def adjustStockBatch(self, changes):
+        """
+        Applies a product name -> change dictionary in a single transaction, returns the
+        names whose change was refused (missing product or stock too low).
+        """
+        refused = []
+        with self.lock, self.connection:
+            for name, change in changes.items():
+                cursor = self.connection.execute(
+                    "UPDATE products SET quantity = quantity + ? WHERE name = ? AND quantity + ? >= 0",
+                    (change, name, change))
+                if cursor.rowcount != 1:
+                    refused.append(name)
+        return refused
+
+    def pageNames(self, offset, limit):
+        """Returns limit product names in order, skipping the first offset ones"""
+        with self.lock:
+            rows = self.connection.execute("SELECT name FROM products ORDER BY name LIMIT ? OFFSET ?", (limit, offset))
+            return [name for (name,) in rows]
+
+    def searchPrefix(self, prefix, limit=SEARCH_LIMIT):
+        """Returns up to limit (name, quantity, price) tuples whose name starts with prefix, as a range scan of the index"""
+        if not prefix:
+            query, parameters = "SELECT name, quantity, price FROM products ORDER BY name LIMIT ?", (limit,)
+        else:
+            upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1) #first string after every name starting with prefix
+            query = "SELECT name, quantity, price FROM products WHERE name >= ? AND name < ? ORDER BY name LIMIT ?"
+            parameters = (prefix, upper_bound, limit)
+        with self.lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    def searchName(self, text, limit=SEARCH_LIMIT):
+        """Returns up to limit (name, quantity, price) tuples whose name contains text (ignoring case)"""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self.lock:
+            return self.connection.execute(
+                "SELECT name, quantity, price FROM products WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (pattern, limit)).fetchall()
+
+    def close(self):
+        """Closes the database"""
+        self.connection.close()
+
+    def __repr__(self):
+        """Displays the products like a dictionary, abbreviated for large catalogues"""
+        items = {name: (quantity, price) for name, quantity, price in self.searchPrefix("", DISPLAY_LIMIT + 1)}
+        if len(items) <= DISPLAY_LIMIT:
+            return repr(items)
+        items.popitem()
+        return f"{repr(items)[:-1]}, ...}} ({len(self)} products)"
+
+INVENTORY = MemoryInventory() #create a global dictionary for the inventory
+
+def set_inventory(backend):
+    """Replaces the global INVENTORY with another backend (MemoryInventory or SQLiteInventory)"""
+    global INVENTORY
+    INVENTORY = backend
+
+class LoadReport:
+    """
+    What read_data loaded and rejected: the number of rows and products loaded, the
+    number of rejected rows by reason and the first LOAD_ERROR_LIMIT rejected rows
+    (line number, reason, row). Duplicate products are reported, the last row is kept.
+    """
+
+    def __init__(self):
+        """Creates an empty report"""
+        self.rows = 0
+        self.loaded = 0
+        self.rejected = {} #reason -> count
+        self.errors = [] #(line number, reason, row)
+
+    def reject(self, line_number, reason, row):
+        """Counts a rejected row and keeps it while under the limit"""
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if len(self.errors) < LOAD_ERROR_LIMIT:
+            self.errors.append((line_number, reason, row))
+
+    def summary(self):
+        """Returns a one line description of the load"""
+        text = f"Loaded {self.loaded} products from {self.rows} rows"
+        if self.rejected:
+            details = ", ".join(f"{count} {reason}" for reason, count in sorted(self.rejected.items()))
+            text += f" ({details})"
+        return text
+
+    def write(self, file_path):
+        """Writes the kept rejected rows to a csv file (line, reason, row)"""
+        with open(file_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["line", "reason", "row"])
+            for line_number, reason, row in self.errors:
+                writer.writerow([line_number, reason, ",".join(row)])
+
+def parse_product(row):
+    """
+    Validates one csv row of the products file.
+
+    Returns:
+        tuple or str: (name, quantity, price), or the reason the row is rejected.
+    """
+    if len(row) < 3:
+        return "missing columns"
+    if not row[0].strip():
+        return "empty name"
+    try:
+        quantity = int(row[1])
+    except ValueError:
+        return "bad quantity"
+    if quantity < 0:
+        return "negative quantity"
+    try:
+        price = float(row[2])
+    except ValueError:
+        return "bad price"
+    if not math.isfinite(price) or price < 0:
+        return "bad price"
+    return row[0], quantity, price
+
+def _parse_products(lines, first_line_number):
+    """
+    Parses and validates csv lines.
+
+    Returns:
+        tuple: The valid (line number, name, quantity, price) rows and the rejected (line number, reason, row) ones.
+    """
+    products = []
+    rejected = []
+    for line_number, row in enumerate(csv.reader(lines), start=first_line_number):
+        if not row: #blank line
+            continue
+        product = parse_product(row)
+        if isinstance(product, str):
+            rejected.append((line_number, product, row))
+        else:
+            products.append((line_number,) + product)
+    return products, rejected
+
+def _parse_products_chunk(file_path, start, end):
+    """
+    Process pool worker: parses the lines between two byte offsets of a products file.
+    The line numbers are relative to the chunk, the caller shifts them.
+
+    Returns:
+        tuple: The valid rows, the rejected rows and the number of lines of the chunk.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        chunk = file.read(end - start).decode()
+    lines = chunk.splitlines()
+    products, rejected = _parse_products(lines, 0)
+    return products, rejected, len(lines)
+
+def split_products_file(file_path, parts):
+    """Returns byte offsets cutting the rows of a products file (after its header) into parts at line ends"""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        file.readline() #header
+        boundaries = [file.tell()]
+        for part in range(1, parts):
+            file.seek(max(boundaries[-1], size * part // parts))
+            file.readline() #move to the end of the line
+            if boundaries[-1] < file.tell() < size:
+                boundaries.append(file.tell())
+    boundaries.append(size)
+    return boundaries
 
-def read_data(file_path):
+def _has_quotes(file_path):
+    """Checks if a file contains quotes, whose fields may span lines and can't be cut anywhere"""
+    with open(file_path, "rb") as file:
+        if os.path.getsize(file_path) == 0:
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped.find(b'"') != -1
+
+def iter_products(file_path, report, workers=None):
+    """
+    Streams the valid (line number, name, quantity, price) rows of a products file and
+    records the rejected ones in report. Files from PARALLEL_LOAD_THRESHOLD bytes are cut
+    at line ends and parsed by a process pool (workers processes, all cores by default),
+    the chunks coming back in file order; files with quoted fields are parsed in one pass.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and os.path.getsize(file_path) >= PARALLEL_LOAD_THRESHOLD and not _has_quotes(file_path):
+        boundaries = split_products_file(file_path, workers * 4)
+        line_number = 2 #the first line after the header
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for products, rejected, line_count in executor.map(
+                    _parse_products_chunk, [file_path] * (len(boundaries) - 1), boundaries[:-1], boundaries[1:]):
+                report.rows += len(products) + len(rejected)
+                for relative_line, reason, row in rejected:
+                    report.reject(line_number + relative_line, reason, row)
+                for relative_line, name, quantity, price in products:
+                    yield line_number + relative_line, name, quantity, price
+                line_number += line_count
+        return
+    with open(file_path, "r", newline="") as file: #open file
+        data = csv.reader(file) #read data from file
+        next(data, None) #skip header
+        for row in data:
+            if not row: #blank line
+                continue
+            report.rows += 1
+            product = parse_product(row)
+            if isinstance(product, str):
+                report.reject(data.line_num, product, row)
+            else:
+                yield (data.line_num,) + product
+
+def read_data(file_path, inventory=None, workers=None, progress=None):
     """
     Each line in the CSV file represents a product with its corresponding
     quantity and price. The function updates the global INVENTORY dictionary
-    with product names as keys and tuples containing the quantity as int
-    and price as float as values
+    (or inventory) with product names as keys and tuples containing the quantity
+    as int and price as float as values.
+
+    The rows are streamed and validated: rows with missing columns, an empty name, a
+    quantity that isn't a positive integer or a price that isn't a positive number are
+    rejected, as are prices the inventory can't store (a fraction of a cent in an
+    ArrayInventory), and duplicate products reported (the last row wins). Large files are
+    parsed in parallel (see iter_products). progress, when given, is called every
+    LOAD_NOTIFY_EVERY products loaded.
+
+    Returns:
+        LoadReport: What was loaded and rejected.
     """
-    with open(file_path, "r") as file: #open file
-        data = csv.reader(file) #read data from file
-        next(data) #skip header
-        for line in data: #print each row in that file
-            INVENTORY[line[0]] = int(line[1]), float(line[2])
+    inventory = INVENTORY if inventory is None else inventory
+    report = LoadReport()
+    products = iter_products(file_path, report, workers)
+    if isinstance(inventory, SQLiteInventory): #bulk import in a single transaction
+        seen = set()
+
+        def rows():
+            """The rows to insert, duplicates reported"""
+            for line_number, name, quantity, price in products:
+                if name in seen:
+                    report.reject(line_number, "duplicate product", [name, str(quantity), str(price)])
+                else:
+                    seen.add(name)
+                    report.loaded += 1
+                yield name, quantity, price
+
+        inventory.importRows(rows())
+        return report
+    for line_number, name, quantity, price in products:
+        duplicate = name in inventory
+        try:
+            inventory[name] = quantity, price
+        except ValueError: #the backend can't store the price
+            report.reject(line_number, "fraction of a cent in price", [name, str(quantity), str(price)])
+            continue
+        if duplicate:
+            report.reject(line_number, "duplicate product", [name, str(quantity), str(price)])
+        else:
+            report.loaded += 1
+        if progress is not None and report.loaded % LOAD_NOTIFY_EVERY == 0:
+            progress()
+    return report
+
+class LoadingInventory(MutableMapping):
+    """
+    Inventory being filled by a background loader (see load_in_background). A lookup of a
+    product that isn't loaded yet waits until the loader reaches it or finishes, so the
+    first products can be served before the end of the load. Listing, counting and
+    writing wait for the whole load.
+    """
+
+    def __init__(self, backend):
+        """Wraps the backend the loader fills"""
+        self.backend = backend
+        self.loaded = threading.Event()
+        self.report = None
+        self.error = None
+        self._condition = threading.Condition()
+
+    def notify(self):
+        """Wakes up the lookups waiting for products, called by the loader"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _waitFor(self, name):
+        """Waits until a product is loaded or the load is over"""
+        if self.loaded.is_set() or name in self.backend:
+            return
+        with self._condition:
+            self._condition.wait_for(lambda: self.loaded.is_set() or name in self.backend)
+
+    def __getitem__(self, name):
+        """Returns (quantity, price) of a product, once loaded"""
+        self._waitFor(name)
+        return self.backend[name]
+
+    def __setitem__(self, name, quantity_price):
+        """Sets a product after the load, which would otherwise overwrite it"""
+        self.loaded.wait()
+        self.backend[name] = quantity_price
+
+    def __delitem__(self, name):
+        """Removes a product after the load"""
+        self.loaded.wait()
+        del self.backend[name]
+
+    def __contains__(self, name):
+        """Checks if a product exists, waiting for it while the load goes on"""
+        self._waitFor(name)
+        return name in self.backend
+
+    def __iter__(self):
+        """Iterates over the product names once everything is loaded"""
+        self.loaded.wait()
+        return iter(self.backend)
+
+    def __len__(self):
+        """Returns the number of products once everything is loaded"""
+        self.loaded.wait()
+        return len(self.backend)
+
+    def adjustStock(self, name, change):
+        """Adds change to the stock of a product, once loaded"""
+        self._waitFor(name)
+        return self.backend.adjustStock(name, change)
+
+    def __getattr__(self, attribute):
+        """Gives access to the other methods of the backend once everything is loaded"""
+        self.loaded.wait()
+        return getattr(self.backend, attribute)
+
+    def __repr__(self):
+        """Shows the inventory once everything is loaded"""
+        self.loaded.wait()
+        return repr(self.backend)
+
+def load_products(file_path, workers=None, report_path=None):
+    """Loads a products file into INVENTORY, printing the report (and writing it to report_path) when rows were rejected"""
+    report = read_data(file_path, workers=workers)
+    if report.rejected:
+        print(report.summary())
+        if report_path:
+            report.write(report_path)
+    return report
+
+def load_in_background(file_path, workers=None, report_path=None):
+    """
+    Loads a products file into the current INVENTORY from a daemon thread. INVENTORY is
+    replaced by a LoadingInventory during the load and given back when it ends, when the
+    load report is printed (and written to report_path).
+
+    Returns:
+        LoadingInventory: The inventory being loaded.
+    """
+    loading = LoadingInventory(INVENTORY)
+    set_inventory(loading)
+
+    def load():
+        """Runs read_data and hands the inventory over"""
+        try:
+            loading.report = read_data(file_path, loading.backend, workers, loading.notify)
+        except (OSError, ValueError, csv.Error) as error:
+            loading.error = error
+        finally:
+            loading.loaded.set()
+            loading.notify()
+            if INVENTORY is loading:
+                set_inventory(loading.backend)
+        if loading.error is not None:
+            print(f"\nThe products could not be loaded: {loading.error}")
+        elif loading.report.rejected:
+            print(f"\n{loading.report.summary()}")
+            if report_path:
+                loading.report.write(report_path)
+
+    threading.Thread(target=load, name="inventory-loader", daemon=True).start()
+    return loading
+
+def trigrams(text):
+    """Returns the set of 3 letter sequences of a lowercased name, padded so short names have some"""
+    padded = f"  {text.lower()} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+class CatalogueIndex:
+    """
+    Search index over the product names of an inventory.
+
+    The lowercased names are kept sorted, so a prefix search is a binary search followed
+    by reading the matches in order: O(log n + results), and a page of the catalogue is a
+    slice. This plays the role of a prefix trie with far less memory in Python. Fuzzy
+    search uses trigram postings (trigram -> array of name positions), built on the first
+    fuzzy search: the candidates come from the rarest trigrams of the query and are ranked
+    by trigram similarity, so typos and partial words still find the product.
+
+    Methods:
+        page: Returns the names of one page of the catalogue
+        searchPrefix: Names starting with a text, ignoring case
+        searchFuzzy: Names most similar to a text
+        search: Prefix matches first, then fuzzy ones
+    """
+
+    def __init__(self, names):
+        """Builds the prefix index of the names"""
+        pairs = sorted((name.lower(), name) for name in names)
+        self.keys = [key for key, name in pairs] #lowercased names, sorted
+        self.names = [name for key, name in pairs] #the names in the same order
+        self._postings = None
+
+    def __len__(self):
+        """Returns the number of names indexed"""
+        return len(self.names)
+
+    def page(self, number, page_size=PAGE_SIZE):
+        """Returns the names of page number (from 0)"""
+        return self.names[number * page_size:(number + 1) * page_size]
+
+    def searchPrefix(self, prefix, limit=SEARCH_LIMIT):
+        """Returns up to limit names starting with prefix (ignoring case), sorted"""
+        prefix = prefix.lower()
+        results = []
+        index = bisect.bisect_left(self.keys, prefix)
+        while index < len(self.keys) and len(results) < limit and self.keys[index].startswith(prefix):
+            results.append(self.names[index])
+            index += 1
+        return results
+
+    def _buildPostings(self):
+        """Builds the trigram postings of every name"""
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                posting = postings.get(trigram)
+                if posting is None:
+                    posting = postings[trigram] = array.array("i")
+                posting.append(position)
+        self._postings = postings
+
+    def searchFuzzy(self, text, limit=SEARCH_LIMIT):
+        """Returns up to limit names sharing the most trigrams with text, best first"""
+        if self._postings is None:
+            self._buildPostings()
+        query = trigrams(text)
+        postings = sorted((self._postings[trigram] for trigram in query if trigram in self._postings), key=len)
+        candidates = set()
+        for posting in postings: #rarest trigrams first, they select the fewest names
+            if candidates and len(candidates) + len(posting) > FUZZY_CANDIDATES:
+                break
+            candidates.update(posting[:FUZZY_CANDIDATES])
+        scored = []
+        for position in candidates: #similarity: shared trigrams over all trigrams of both (Jaccard)
+            padded = f"  {self.keys[position]} "
+            shared = sum(1 for trigram in query if trigram in padded)
+            scored.append((shared / (len(query) + len(padded) - 2 - shared), position))
+        return [self.names[position] for score, position in heapq.nlargest(limit, scored)]
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Returns the names starting with text, completed by the most similar ones"""
+        results = self.searchPrefix(text, limit)
+        if len(results) < limit:
+            found = set(results)
+            results += [name for name in self.searchFuzzy(text, limit) if name not in found][:limit - len(results)]
+        return results
+
+class DatabaseCatalogue:
+    """
+    The catalogue of a SQLiteInventory, read from the database instead of an in-memory
+    index: nothing is loaded and the products are never counted. A page is an
+    ORDER BY name LIMIT/OFFSET query and a search is the prefix range scan of the primary
+    key (case sensitive), completed by the names containing the text.
+
+    Methods:
+        page: Returns the names of one page of the catalogue
+        search: Prefix matches first, then names containing the text
+    """
+
+    def __init__(self, inventory):
+        """Reads the catalogue of a SQLiteInventory"""
+        self.inventory = inventory
+
+    def page(self, number, page_size=PAGE_SIZE):
+        """Returns the names of page number (from 0)"""
+        return self.inventory.pageNames(number * page_size, page_size)
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Returns the names starting with text, completed by the ones containing it"""
+        results = [name for name, quantity, price in self.inventory.searchPrefix(text, limit)]
+        if len(results) < limit:
+            found = set(results)
+            contained = self.inventory.searchName(text, limit + len(results))
+            results += [name for name, quantity, price in contained if name not in found][:limit - len(results)]
+        return results
+
+_CATALOGUE = {"index": None, "inventory": None, "size": -1} #index of the inventory, rebuilt when it changes
+
+def catalogue_index():
+    """
+    Returns the CatalogueIndex of INVENTORY, building it on first use. Stock changes don't
+    touch the names, so it is only rebuilt when the inventory is replaced or its number of
+    products changes. A SQLiteInventory is browsed through a DatabaseCatalogue instead.
+    """
+    if isinstance(INVENTORY, SQLiteInventory):
+        if _CATALOGUE["inventory"] is not INVENTORY:
+            _CATALOGUE["index"] = DatabaseCatalogue(INVENTORY)
+            _CATALOGUE["inventory"] = INVENTORY
+        return _CATALOGUE["index"]
+    if _CATALOGUE["inventory"] is not INVENTORY or _CATALOGUE["size"] != len(INVENTORY):
+        _CATALOGUE["index"] = CatalogueIndex(INVENTORY)
+        _CATALOGUE["inventory"] = INVENTORY
+        _CATALOGUE["size"] = len(INVENTORY)
+    return _CATALOGUE["index"]
+
+def print_products(names):
+    """Displays the stock and price of the given products, one per line"""
+    for name in names:
+        quantity, price = INVENTORY[name]
+        print(f"{name}: {quantity} available at {price}$")
+
+def browse_catalogue(page_size=PAGE_SIZE):
+    """
+    Lists the inventory a page at a time. Only the products of the shown page are read,
+    so large catalogues display instantly, and a search shows the best matches of a text.
+    """
+    index = catalogue_index()
+    names = index.page(0, page_size)
+    if not names:
+        print("The inventory is empty")
+        return
+    pages = (len(index) + page_size - 1) // page_size if isinstance(index, CatalogueIndex) else None #the database isn't counted
+    page = 0
+    show_page = True
+    while True:
+        if show_page:
+            print(f"Page {page + 1} of {pages}" if pages else f"Page {page + 1}")
+            print_products(names)
+        command = input("Next page (n), previous page (p), search (s), back (any button): ").strip().lower()
+        show_page = command in ("n", "p")
+        if command == "n":
+            following = index.page(page + 1, page_size)
+            if following: #stay on the last page
+                page += 1
+                names = following
+        elif command == "p" and page > 0:
+            page -= 1
+            names = index.page(page, page_size)
+        elif command == "s":
+            results = index.search(input("Search the catalogue: ").strip(), page_size)
+            if results:
+                print_products(results)
+            else:
+                print("No product found")
+        else:
+            break
+
+def _fsync_directory(directory):
+    """Makes a rename in directory durable, where the platform allows opening directories"""
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError: #not supported on Windows, where the rename itself is durable enough
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+class InventoryJournal:
+    """
+    Append-only write-ahead journal of inventory and cart changes, with compact snapshots.
+
+    Every change is one JSON line with an increasing sequence number. Stock records hold
+    the new quantity and price of a product (not the difference), so replaying them twice
+    is harmless. The lines are fsynced in batches (every fsync_batch records or
+    fsync_interval seconds, and on sync/close). Every snapshot_every records the inventory
+    and the open carts are written to a snapshot file, fsynced and atomically renamed over
+    the previous one, then the journal is emptied. Recovery loads the snapshot and replays
+    the journal records newer than it, ignoring a line torn by a crash.
+
+    Changes that must not be split, like the stock taken by a cart and the cart line
+    holding it, are recorded inside atomic(): they are written as a single "group" line,
+    which a crash keeps or drops as a whole.
+
+    Methods:
+        recover: Loads the latest state into an inventory backend
+        record: Appends a change
+        atomic: Groups the changes recorded inside into one line
+        sync: Writes and fsyncs the pending records
+        snapshot: Writes a snapshot and empties the journal
+        close: Syncs and closes the journal
+    """
+
+    def __init__(self, directory, fsync_batch=JOURNAL_FSYNC_BATCH, fsync_interval=JOURNAL_FSYNC_INTERVAL,
+                 snapshot_every=SNAPSHOT_EVERY):
+        """Creates the journal in directory, which is created if needed"""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.inventory = None #backend written to the snapshots, set by JournaledInventory
+        self.carts = {} #cart id -> {product name: quantity} of the carts not checked out
+        self.sequence = 0
+        self.pending = 0
+        self.since_snapshot = 0
+        self.last_sync = time.monotonic()
+        self._file = None
+        self._group = None #records of the atomic block being written
+
+    def exists(self):
+        """Checks if there is a state to recover"""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def _apply(self, inventory, entry):
+        """Applies one record to the inventory (skipped when None) or the carts"""
+        operation = entry["op"]
+        if operation == "group":
+            for record in entry["records"]:
+                self._apply(inventory, record)
+        elif operation == "line":
+            lines = self.carts.setdefault(entry["cart"], {})
+            if entry["quantity"] > 0:
+                lines[entry["name"]] = entry["quantity"]
+            else:
+                lines.pop(entry["name"], None)
+        elif operation in ("checkout", "close"): #the cart is done or abandoned
+            self.carts.pop(entry["cart"], None)
+        elif inventory is None: #only keeping track of the carts
+            pass
+        elif operation == "stock":
+            inventory[entry["name"]] = (entry["quantity"], entry["price"])
+        elif operation == "delete":
+            if entry["name"] in inventory:
+                del inventory[entry["name"]]
+
+    def recover(self, inventory):
+        """
+        Loads the latest snapshot into inventory and replays the journal tail. A torn
+        last line is cut off so new records start on a clean line.
+
+        Returns:
+            int: The number of journal records replayed.
+        """
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as file:
+                snapshot = json.load(file)
+            inventory.clear()
+            for name, quantity, price in snapshot["inventory"]:
+                inventory[name] = (quantity, price)
+            self.carts = {cart: dict(lines) for cart, lines in snapshot["carts"].items()}
+            self.sequence = snapshot["sequence"]
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            valid_length = 0
+            with open(self.journal_path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break #torn by a crash
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_length += len(line)
+                    if entry["seq"] <= self.sequence: #already in the snapshot
+                        continue
+                    self._apply(inventory, entry)
+                    self.sequence = entry["seq"]
+                    replayed += 1
+            with open(self.journal_path, "r+b") as file:
+                file.truncate(valid_length)
+        self.since_snapshot = replayed
+        return replayed
+
+    def _open(self):
+        """Opens the journal for appending"""
+        if self._file is None:
+            self._file = open(self.journal_path, "a")
+        return self._file
+
+    @contextmanager
+    def atomic(self):
+        """Writes the changes recorded inside the block as one journal line, replayed all or nothing"""
+        if self._group is not None: #already inside an atomic block
+            yield
+            return
+        self._group = []
+        try:
+            yield
+        finally:
+            records, self._group = self._group, None
+            if len(records) == 1:
+                self.record(records[0])
+            elif records:
+                self.record({"op": "group", "records": records})
+
+    def record(self, entry):
+        """Appends a change (a dictionary with an "op" key), syncing and snapshotting when due"""
+        if self._group is not None: #written when the atomic block ends
+            self._group.append(entry)
+            return
+        self.sequence += 1
+        entry["seq"] = self.sequence
+        self._open().write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._apply(None, entry) #keep the open carts for the snapshots
+        self.pending += 1
+        self.since_snapshot += 1
+        if self.pending >= self.fsync_batch or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+        if self.since_snapshot >= self.snapshot_every and self.inventory is not None:
+            self.snapshot()
+
+    def sync(self):
+        """Writes the pending records and fsyncs the journal"""
+        if self._file is not None and self.pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def snapshot(self, inventory=None):
+        """
+        Writes the inventory (self.inventory when None) and the open carts to a new snapshot,
+        atomically replacing the previous one, then empties the journal.
+        """
+        inventory = self.inventory if inventory is None else inventory
+        self.sync()
+        snapshot = {"sequence": self.sequence,
+                    "inventory": [[name, quantity, price] for name, (quantity, price) in inventory.items()],
+                    "carts": self.carts}
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(snapshot, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+        _fsync_directory(self.directory)
+        if self._file is not None: #every record is in the snapshot now
+            self._file.close()
+            self._file = None
+        open(self.journal_path, "w").close()
+        self.since_snapshot = 0
+
+    def close(self):
+        """Syncs and closes the journal"""
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class JournaledInventory(MutableMapping):
+    """
+    Inventory backend wrapper writing every stock change to an InventoryJournal before
+    returning. Reads and the other backend methods (searchPrefix, searchName, ...) go
+    straight to the wrapped backend.
+    """
+
+    def __init__(self, backend, journal):
+        """Wraps backend and makes journal snapshot it"""
+        self.backend = backend
+        self.journal = journal
+        journal.inventory = backend
+
+    def __getitem__(self, name):
+        """Returns (quantity, price) of a product"""
+        return self.backend[name]
+
+    def __setitem__(self, name, quantity_price):
+        """Sets a product and journals it"""
+        self.backend[name] = quantity_price
+        quantity, price = quantity_price
+        self.journal.record({"op": "stock", "name": name, "quantity": quantity, "price": price})
+
+    def __delitem__(self, name):
+        """Removes a product and journals it"""
+        del self.backend[name]
+        self.journal.record({"op": "delete", "name": name})
+
+    def __contains__(self, name):
+        """Checks if a product exists"""
+        return name in self.backend
+
+    def __iter__(self):
+        """Iterates over the product names"""
+        return iter(self.backend)
+
+    def __len__(self):
+        """Returns the number of products"""
+        return len(self.backend)
+
+    def __getattr__(self, attribute):
+        """Gives access to the other methods of the backend"""
+        return getattr(self.backend, attribute)
+
+    def adjustStock(self, name, change):
+        """Adds change to the stock through the backend and journals the new stock"""
+        if not self.backend.adjustStock(name, change):
+            return False
+        quantity, price = self.backend[name]
+        self.journal.record({"op": "stock", "name": name, "quantity": quantity, "price": price})
+        return True
+
+    def adjustStockBatch(self, changes):
+        """Applies the changes through the backend and journals the new stock of every product changed"""
+        refused = self.backend.adjustStockBatch(changes)
+        skipped = set(refused)
+        for name in changes:
+            if name not in skipped:
+                quantity, price = self.backend[name]
+                self.journal.record({"op": "stock", "name": name, "quantity": quantity, "price": price})
+        return refused
+
+    def __repr__(self):
+        """Shows the wrapped inventory"""
+        return repr(self.backend)
+
+class Reservation:
+    """
+    Stock of one product held for a cart by a ReservationEngine until it is committed,
+    released or expires.
+
+    Attributes:
+    reservation_id: The number of the reservation, an integer
+    name: The name of the product, a string
+    quantity: The quantity held, an integer
+    expires_at: The time.monotonic() time at which the stock goes back to the inventory, a float
+    """
+
+    __slots__ = ["reservation_id", "name", "quantity", "expires_at"]
+    def __init__(self, reservation_id, name, quantity, expires_at):
+        """Constructs all the necessary attributes for the Reservation object"""
+        self.reservation_id = reservation_id
+        self.name = name
+        self.quantity = quantity
+        self.expires_at = expires_at
+
+class ReservationEngine:
+    """
+    Thread-safe stock reservations for many carts sharing one inventory.
+
+    Every product has its own lock, so carts reserving different products never wait for
+    each other, while two carts reserving the same product are serialized and the stock
+    can't be oversold. Reserved stock is taken out of the inventory at once and goes back
+    when the reservation is released or when its time to live runs out (expire, called on
+    every reservation and by the optional reaper thread).
+
+    Methods:
+        reserve: Takes stock out of the inventory for a new or existing reservation
+        release: Puts some or all of the reserved stock back
+        commit: Makes a reservation final (the stock is sold)
+        expire: Releases every reservation whose time to live has run out
+        startReaper/stopReaper: Expire reservations from a background thread
+    """
+
+    def __init__(self, inventory=None, ttl=RESERVATION_TTL):
+        """
+        Creates an engine over an inventory backend (the global INVENTORY when None) with
+        reservations living ttl seconds.
+        """
+        self.inventory = inventory
+        self.ttl = ttl
+        self._product_locks = {}
+        self._registry_lock = threading.Lock() #guards the reservations, the expiry heap and the product locks
+        self._reservations = {}
+        self._expiry = [] #(expires_at, reservation_id) heap, entries of extended reservations are skipped
+        self._ids = itertools.count(1)
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+
+    def _inventory(self):
+        """Returns the inventory backend in use"""
+        return INVENTORY if self.inventory is None else self.inventory
+
+    def _lock_for(self, name):
+        """Returns the lock of a product, creating it on first use"""
+        with self._registry_lock:
+            lock = self._product_locks.get(name)
+            if lock is None:
+                lock = self._product_locks[name] = threading.Lock()
+            return lock
+
+    def reserve(self, name, quantity, reservation=None, partial=True):
+        """
+        Takes quantity of a product out of the inventory and holds it, in a new reservation
+        or added to an existing one (whose time to live is renewed).
+
+        Parameters:
+            name: The name of the product.
+            quantity: The quantity wanted.
+            reservation: An existing Reservation of the same product to add to.
+            partial: Reserve whatever is left when the stock is too low, otherwise reserve nothing.
+
+        Returns:
+            Reservation or None: The reservation, None if the product doesn't exist or nothing could be reserved.
+
+        Raises:
+            ValueError: If quantity is negative.
+        """
+        if quantity < 0:
+            raise ValueError(f"Cannot reserve a negative quantity ({quantity})")
+        self.expire()
+        inventory = self._inventory()
+        with self._lock_for(name):
+            if name not in inventory:
+                return None
+            stock_quantity = inventory[name][0]
+            if quantity > stock_quantity:
+                if not partial:
+                    return None
+                quantity = stock_quantity
+            if quantity <= 0 or not inventory.adjustStock(name, -quantity):
+                return reservation
+            with self._registry_lock:
+                expires_at = time.monotonic() + self.ttl
+                if reservation is None or reservation.reservation_id not in self._reservations:
+                    reservation = Reservation(next(self._ids), name, 0, expires_at)
+                    self._reservations[reservation.reservation_id] = reservation
+                reservation.quantity += quantity
+                reservation.expires_at = expires_at
+                heapq.heappush(self._expiry, (expires_at, reservation.reservation_id))
+        return reservation
+
+    def release(self, reservation, quantity=None):
+        """
+        Puts quantity (everything when None) of the reserved stock back in the inventory.
+
+        Returns:
+            int: The quantity actually released, 0 if the reservation is no longer active or
+            the inventory refused the stock back (the hold is then left unchanged).
+
+        Raises:
+            ValueError: If quantity is negative.
+        """
+        if quantity is not None and quantity < 0:
+            raise ValueError(f"Cannot release a negative quantity ({quantity})")
+        with self._lock_for(reservation.name): #no other change of this product until the hold is updated
+            with self._registry_lock:
+                if reservation.reservation_id not in self._reservations:
+                    return 0
+                if quantity is None or quantity > reservation.quantity:
+                    quantity = reservation.quantity
+            if not self._inventory().adjustStock(reservation.name, quantity):
+                return 0
+            with self._registry_lock:
+                reservation.quantity -= quantity
+                if reservation.quantity == 0:
+                    self._reservations.pop(reservation.reservation_id, None)
+        return quantity
+
+    def commit(self, reservation):
+        """
+        Makes a reservation final: the stock stays out of the inventory and no longer expires.
+
+        Returns:
+            int: The quantity committed, 0 if the reservation had expired or was released.
+        """
+        with self._lock_for(reservation.name): #a release in progress finishes first, locks taken in its order
+            with self._registry_lock:
+                if self._reservations.pop(reservation.reservation_id, None) is None:
+                    return 0
+                return reservation.quantity
+
+    def isActive(self, reservation):
+        """Checks if a reservation still holds its stock"""
+        with self._registry_lock:
+            return reservation.reservation_id in self._reservations
+
+    def reservedQuantity(self):
+        """Returns the total quantity held by active reservations"""
+        with self._registry_lock:
+            return sum(reservation.quantity for reservation in self._reservations.values())
+
+    def expire(self, now=None):
+        """
+        Releases every reservation whose time to live has run out.
+
+        Returns:
+            int: The number of reservations expired.
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._registry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, reservation_id = heapq.heappop(self._expiry)
+                reservation = self._reservations.get(reservation_id)
+                if reservation is not None and reservation.expires_at == expires_at: #not renewed since
+                    expired.append(reservation)
+        return sum(1 for reservation in expired if self.release(reservation))
+
+    def startReaper(self, interval=1.0):
+        """Starts a daemon thread expiring reservations every interval seconds"""
+        if self._reaper is not None:
+            return
+        self._reaper_stop.clear()
+
+        def reap():
+            """Expires reservations until stopReaper is called"""
+            while not self._reaper_stop.wait(interval):
+                self.expire()
+
+        self._reaper = threading.Thread(target=reap, name="reservation-reaper", daemon=True)
+        self._reaper.start()
+
+    def stopReaper(self):
+        """Stops the reaper thread"""
+        if self._reaper is not None:
+            self._reaper_stop.set()
+            self._reaper.join()
+            self._reaper = None
+
+def is_whole_cents(price):
+    """Checks that a price (float, string or Decimal) has no fraction of a cent, allowing for the float representation error"""
+    cents = float(price) * CENTS
+    return abs(cents - round(cents)) < 1e-6
+
+@lru_cache(maxsize=65536)
+def to_cents(price):
+    """
+    Converts a price (float, string or Decimal) to an integer number of cents, rounding
+    half up. The bills are computed in cents, so a product price with a fraction of a
+    cent is billed rounded (ArrayInventory, which stores cents, refuses such prices).
+    """
+    return int((Decimal(str(price)) * CENTS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def format_cents(cents):
+    """Formats cents like the bill always did (1.5 rather than 1.50)"""
+    return f"{cents / CENTS}"
+
+class TieredDiscount:
+    """
+    Discount rule by quantity of a product in the cart: the largest tier whose minimum
+    quantity is reached applies. The default is the historic rule, 10% from 4 items.
+
+    Attributes:
+    tiers: sorted (minimum quantity, discount in basis points) pairs
+    """
+
+    def __init__(self, tiers=None):
+        """Creates the rule from (minimum quantity, basis points) pairs"""
+        if tiers is None:
+            tiers = [(DISCOUNT_MIN_QUANTITY, round(DISCOUNT_RATE * BASIS_POINTS))]
+        self.tiers = sorted(tiers)
+        self._thresholds = [minimum for minimum, basis_points in self.tiers]
+
+    def basisPoints(self, name, quantity):
+        """Returns the discount of a cart line in basis points"""
+        index = bisect.bisect_right(self._thresholds, quantity)
+        return self.tiers[index - 1][1] if index else 0
+
+class VatRule:
+    """
+    VAT rule: one rate for every product, overridden per product (SKU) when needed.
+    Rates are in basis points, the default is the historic 7%.
+    """
+
+    def __init__(self, default=None, per_sku=None):
+        """Creates the rule from a default rate and a product name -> rate dictionary"""
+        self.default = round(VAT_RATE * BASIS_POINTS) if default is None else default
+        self.per_sku = dict(per_sku or {})
+
+    def basisPoints(self, name):
+        """Returns the VAT rate of a product in basis points"""
+        return self.per_sku.get(name, self.default)
+
+class PricingEngine:
+    """
+    Prices carts in exact integer arithmetic. Every line is worth
+    quantity * price in cents * (1 - discount) * (1 + VAT), with the rates in basis points,
+    so the amounts are integers in 1/100000000 of a cent and the cart total is rounded half
+    up to the cent only once, at the end.
+
+    The rules are pluggable: discount must have basisPoints(name, quantity) and vat must
+    have basisPoints(name).
+
+    Methods:
+        priceCart: Prices one cart
+        priceBatch: Prices many carts, reusing the VAT of every product
+    """
+
+    def __init__(self, discount=None, vat=None):
+        """Creates an engine with the given rules (the historic ones by default)"""
+        self.discount = TieredDiscount() if discount is None else discount
+        self.vat = VatRule() if vat is None else vat
+
+    def priceCart(self, lines):
+        """
+        Prices one cart.
+
+        Parameters:
+            lines: (name, quantity, price in cents) tuples.
+
+        Returns:
+            int: The total with discounts and VAT, in cents.
+        """
+        return self.priceBatch([lines])[0]
+
+    def priceBatch(self, carts):
+        """
+        Prices many carts in one pass. The VAT factor of every product is looked up once
+        for the whole batch.
+
+        Parameters:
+            carts: An iterable of carts, each an iterable of (name, quantity, price in cents) tuples.
+
+        Returns:
+            list of int: The total of every cart, in cents.
+        """
+        scale = BASIS_POINTS * BASIS_POINTS
+        half = scale // 2
+        discount = self.discount.basisPoints
+        vat = self.vat.basisPoints
+        vat_factors = {} #product name -> BASIS_POINTS + VAT
+        totals = []
+        for lines in carts:
+            amount = 0
+            for name, quantity, price_cents in lines:
+                vat_factor = vat_factors.get(name)
+                if vat_factor is None:
+                    vat_factor = vat_factors[name] = BASIS_POINTS + vat(name)
+                amount += quantity * price_cents * (BASIS_POINTS - discount(name, quantity)) * vat_factor
+            totals.append((amount + half) // scale) #round half up to the cent
+        return totals
+
+PRICING = PricingEngine() #the pricing used by the carts unless they are given another one
 
 class Article:
     """
@@ -79,19 +1476,40 @@ class Cart:
     """
     A class to manage a shopping cart in a retail environment.
     
-    attributes: list_of_purchased (list): A list of Article objects representing items added to the cart
+    attributes: articles (dict): The Article objects added to the cart keyed by product name, in the order they were added
+        list_of_purchased (list): A list of Article objects representing items added to the cart (read only)
     
     methods: addProduct(name, quantity): Adds a product to the cart or updates its quantity if already present
         removeProduct(name, quantity): Removes a specified quantity of a product from the cart or removes it entirely if quantity exceeds or matches current
+        updateProduct(name, quantity): Sets the quantity of a product in the cart
         displayCart(): Prints the contents of the cart
         checkout(): Calculates and displays the total cost of the cart, including discounts and VAT
         
     """
-    def __init__(self):
+    def __init__(self, engine=None, pricing=None, journal=None, cart_id="cart"):
         """
-        Initialize a new instance of Cart with an empty list for storing purchased items
+        Initialize a new instance of Cart with an empty index for storing purchased items.
+        Dictionaries keep insertion order, so the cart lines are looked up by name in O(1)
+        and still displayed in the order they were added.
+
+        With a ReservationEngine the stock is reserved through the engine, which makes it
+        safe for many carts in different threads to share the inventory. The reservations
+        are committed at checkout, and lines whose reservation expired are dropped then.
+
+        The cart is priced by pricing, a PricingEngine, or the module's PRICING when None.
+        With an InventoryJournal the cart lines and checkouts are journaled under cart_id.
         """
-        self.list_of_purchased = []
+        self.articles = {}
+        self.engine = engine
+        self.pricing = pricing
+        self.journal = journal
+        self.cart_id = cart_id
+        self.reservations = {} #product name -> Reservation, only used with an engine
+
+    @property
+    def list_of_purchased(self):
+        """The Article objects in the cart, in the order they were added"""
+        return list(self.articles.values())
 
     def addProduct(self, name, quantity):
         """
@@ -103,25 +1521,42 @@ class Cart:
 
         If the product is not found in the INVENTORY, a message is printed.
         """
-        if name in INVENTORY.keys(): #check if the input is in the choices
+        with self._atomic(): #the stock taken and the cart line are journaled together
+            self._addProduct(name, quantity)
+
+    def _atomic(self):
+        """The journal's atomic block, or a no-op without a journal"""
+        return self.journal.atomic() if self.journal is not None else nullcontext()
+
+    def _addProduct(self, name, quantity):
+        """Does the work of addProduct"""
+        if name in INVENTORY: #check if the input is in the choices
             stock_quantity, price = INVENTORY[name] #assign and get the quantity and price of a product
-            if quantity > INVENTORY[name][0]: #if the wanted quantity is more than inventory put all available quantity
+            if self.engine is not None: #reserve under the product lock, the stock may have changed since
+                reservation = self.engine.reserve(name, quantity, self.reservations.get(name))
+                held = reservation.quantity if reservation is not None else 0
+                article = self.articles.get(name)
+                quantity = held - (article.getQuantity() if article is not None else 0) #what this call reserved
+                if reservation is not None:
+                    self.reservations[name] = reservation
+                if article is not None:
+                    article.setQuantity(held)
+                else:
+                    self.articles[name] = Article(name, price, quantity)
+                self._journalLine(name)
+                return
+            if quantity > stock_quantity: #if the wanted quantity is more than inventory put all available quantity
                 quantity = stock_quantity
 
-            #INVENTORY[name] = (stock_quantity - quantity, price)
-
-            flag = False  #if the article exists then add to it the quantity
-            for article in self.list_of_purchased:
-                if article.getName() == name: #check if the input article name is there in cart
-                    article.setQuantity(article.getQuantity() + quantity) #add the previous quantity with the new one
-                    flag = True
-                    break
-            
-            if flag == False: #if it is not present from before then add it as new itm
-                self.list_of_purchased.append(Article(name, price, quantity))
+            article = self.articles.get(name) #if the article exists then add to it the quantity
+            if article is not None:
+                article.setQuantity(article.getQuantity() + quantity) #add the previous quantity with the new one
+            else: #if it is not present from before then add it as new itm
+                self.articles[name] = Article(name, price, quantity)
             
             #else:
-            INVENTORY[name] = (stock_quantity - quantity, price) #update the inventory
+            INVENTORY.adjustStock(name, -quantity) #update the inventory
+            self._journalLine(name)
 
         else: #if item not in inventory then print this message
             print(f"Item {name} is not found in the inventory")
@@ -136,64 +1571,111 @@ class Cart:
             name: The name of the product to remove.
             quantity: The quantity of the product to remove.
         """
+        with self._atomic(): #the stock given back and the cart line are journaled together
+            self._removeProduct(name, quantity)
+
+    def _removeProduct(self, name, quantity):
+        """Does the work of removeProduct"""
+        if name in INVENTORY: #check if item to be removed exist in the inventory
+            article = self.articles.get(name) #check availability in cart
+            if article is not None and self.engine is not None: #give the reserved stock back through the engine
+                reservation = self.reservations.get(name)
+                if reservation is not None:
+                    self.engine.release(reservation, quantity)
+                if reservation is None or not self.engine.isActive(reservation):
+                    del self.articles[name]
+                    self.reservations.pop(name, None)
+                else:
+                    article.setQuantity(reservation.quantity)
+                self._journalLine(name)
+                print(f"Removed {quantity} of {name} from the cart.") #print removed item and its quantity
+            elif article is not None:
+                current_quantity = article.getQuantity()
 
-        if name in INVENTORY.keys(): #check if item to be removed exist in the inventory
-            for article in self.list_of_purchased:
-                if article.getName() == name: #check availability in cart
+                if quantity >= current_quantity: #if specified quantity is bigger or more than the inventory then get max
+                    del self.articles[name] #remove the item
+                    INVENTORY.adjustStock(name, current_quantity) #update inventory
 
-                    current_quantity = article.getQuantity()
-                    
-                    if quantity >= current_quantity: #if specified quantity is bigger or more than the inventory then get max
-                        self.list_of_purchased.remove(article) #remove the item
-                        INVENTORY[name] = (INVENTORY[name][0] + current_quantity, INVENTORY[name][1]) #update inventory
+                else:
+                    article.setQuantity(current_quantity - quantity) #remove the specified amount of items
+                    INVENTORY.adjustStock(name, quantity) #update inventory
 
-                    else:
-                        article.setQuantity(current_quantity - quantity) #remove the specified amount of items
-                        INVENTORY[name] = (INVENTORY[name][0] + quantity, INVENTORY[name][1]) #update inventory
-                    
-                    print(f"Removed {quantity} of {name} from the cart.") #print removed item and its quantity
+                self._journalLine(name)
+                print(f"Removed {quantity} of {name} from the cart.") #print removed item and its quantity
         else:
             print(f"Item {name} is not found in the cart") #if the article doesn't exist in cart
 
+    def _journalLine(self, name):
+        """Journals the quantity of a product now in the cart"""
+        if self.journal is not None:
+            article = self.articles.get(name)
+            self.journal.record({"op": "line", "cart": self.cart_id, "name": name,
+                                 "quantity": article.getQuantity() if article is not None else 0})
+
+    def restoreLines(self, lines):
+        """Puts back recovered cart lines (product name -> quantity), their stock is already taken"""
+        for name, quantity in lines.items():
+            if name in INVENTORY:
+                self.articles[name] = Article(name, INVENTORY[name][1], quantity)
+
+    def updateProduct(self, name, quantity):
+        """
+        Sets the quantity of a product in the cart, adding or removing the difference
+        (removing the product when quantity is 0 or less).
+
+        Parameters:
+            name: The name of the product to update.
+            quantity: The new quantity in the cart.
+        """
+        article = self.articles.get(name)
+        current_quantity = article.getQuantity() if article is not None else 0
+        if quantity > current_quantity:
+            self.addProduct(name, quantity - current_quantity)
+        elif quantity < current_quantity:
+            self.removeProduct(name, current_quantity - max(quantity, 0))
+
     def displayCart(self):
         """
         Display the content of a cart name, quantity and price 
         """
-        articles = self.list_of_purchased #get list
-        if self.list_of_purchased == []: #if empty then no items in cart
+        if not self.articles: #if empty then no items in cart
             print("Sorry the shopping cart is empty") 
             return None
         
-        for article in range(len(articles)): #print the articles their name, quantity and price
-                print(f"Article {article+1}-",articles[article])
+        for number, article in enumerate(self.articles.values(), start=1): #print the articles their name, quantity and price
+                print(f"Article {number}-",article)
 
     def checkout(self):
         """
         Checkout the cart, calculate the total where if an article has more than
         3 items apply discount to it. Apply then at end a total VAT to the amount.
+        The total is printed and returned (None for an empty cart).
+
+        The amounts are computed in exact cents by the pricing engine, whose default rules
+        are the ones above. With a journal the checkout is journaled and the cart emptied.
         """
-        if len(self.list_of_purchased) == 0: #if no elements then empty
+        if self.engine is not None: #make the reservations final, expired ones are no longer in the cart
+            for name, reservation in list(self.reservations.items()):
+                committed = self.engine.commit(reservation)
+                if committed == 0:
+                    print(f"The reservation of {name} expired, it was removed from the cart")
+                    del self.articles[name]
+                else:
+                    self.articles[name].setQuantity(committed)
+            self.reservations = {}
+
+        if len(self.articles) == 0: #if no elements then empty
             print("Cannot checkout, cart is empty!")
             return None
 
-        #add items quantity and prices from cart
-        shopping_price_quantity = [[article.getQuantity(), article.getPrice()] for article in self.list_of_purchased]
-        discount = (1-DISCOUNT_RATE) #get discount percentage 
-        vat = (1+VAT_RATE) #get vat percentage
-        total_amount_no_vat = 0 #total amount initialized equal to 0
-
-        for article in shopping_price_quantity:
-
-            if article[0] > 3: #if article has more than 3 items then apply discount
-                total_per_article = article[0] * article[1] * discount #apply discount
-
-            else: #if less than or equal 3 don't apply
-                total_per_article = article[0] * article[1]
-            
-            total_amount_no_vat += total_per_article #add the amount of each article to the total
-        
-        total_amount_with_vat = total_amount_no_vat * vat #total amount with VAT applied
-        print(f"Your bill is {round(total_amount_with_vat, 2)}$")
+        pricing = PRICING if self.pricing is None else self.pricing #get the pricing rules
+        total_cents = pricing.priceCart( #total of the articles with discounts and VAT, in cents
+            (article.getName(), article.getQuantity(), to_cents(article.getPrice())) for article in self.articles.values())
+        print(f"Your bill is {format_cents(total_cents)}$")
+        if self.journal is not None: #the journal forgets the cart, so does the cart: a second checkout can't bill it again
+            self.journal.record({"op": "checkout", "cart": self.cart_id, "total": total_cents})
+            self.articles = {}
+        return total_cents / CENTS
 
 def check_choice(customer_choice):
     """Check if the input is valid and exists"""
@@ -206,8 +1688,8 @@ def perform_operation(crt, choice, file_path):
     This function is passed the cart object and the choice to perform 
     the specific act or operation i.e. remove, add and checkout
     """
-    if choice == "1": #if 1 display inventory
-        print(INVENTORY)
+    if choice == "1": #if 1 browse the inventory a page at a time
+        browse_catalogue()
     elif choice == "2": #if 2 display cart items
         crt.displayCart()
     elif choice == "3": #if 3 add item
@@ -242,16 +1724,395 @@ def menu():
     print("5. Checkout")
     print("6. Exit")
 
-def main():
+class Session:
+    """A customer connected to the server: its cart and the time it was last used"""
+
+    __slots__ = ["session_id", "cart", "last_seen"]
+    def __init__(self, session_id, cart):
+        """Constructs all the necessary attributes for the Session object"""
+        self.session_id = session_id
+        self.cart = cart
+        self.last_seen = time.monotonic()
+
+class ShoppingServer:
+    """
+    Asyncio TCP server hosting many carts against the shared inventory.
+
+    Clients send one JSON object per line and get one JSON object back per line:
+        {"op": "open"}                                        -> {"ok": true, "session": "..."}
+        {"op": "add", "session": "...", "name": "apple", "quantity": 2}
+        {"op": "remove", "session": "...", "name": "apple", "quantity": 1}
+        {"op": "cart", "session": "..."}
+        {"op": "checkout", "session": "..."}                  -> also holds "total"
+        {"op": "close", "session": "..."}
+    Every answer holds the messages the cart printed and the lines of the cart. After a
+    checkout the session starts a new empty cart. With a journal the session carts are
+    journaled, and as sessions don't survive a restart the stock held by carts recovered
+    from the journal is given back when the server starts. The stock is reserved through a
+    ReservationEngine, so the sessions never oversell, and sessions not used for
+    idle_timeout seconds are evicted with their reserved stock released. Sessions are
+    kept by id, a client can reconnect and continue its session.
+
+    Methods:
+        handleRequest: Runs one request and returns the answer
+        evictIdle: Closes the sessions idle for too long
+        start: Starts listening, returns the asyncio server
+        run: Serves until interrupted
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, idle_timeout=SESSION_IDLE_TIMEOUT, inventory=None,
+                 journal=None):
+        """Creates a server for the inventory (the global INVENTORY when None), port 0 picks a free port"""
+        self.host = host
+        self.journal = journal
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.engine = ReservationEngine(inventory, ttl=2 * idle_timeout) #eviction releases first, the ttl is a backstop
+        self.sessions = OrderedDict() #session id -> Session, least recently used first
+        self._evictor = None
+        self._syncer = None
+
+    def openSession(self):
+        """Creates a session with an empty cart"""
+        session_id = secrets.token_hex(8)
+        session = Session(session_id, Cart(self.engine, journal=self.journal, cart_id=session_id))
+        self.sessions[session.session_id] = session
+        return session
+
+    def closeSession(self, session):
+        """Releases the stock reserved by the session's cart and forgets it"""
+        if self.journal is None:
+            for reservation in session.cart.reservations.values():
+                self.engine.release(reservation)
+        else:
+            with self.journal.atomic(): #the released stock and the closed cart are journaled together
+                for reservation in session.cart.reservations.values():
+                    self.engine.release(reservation)
+                self.journal.record({"op": "close", "cart": session.session_id})
+        self.sessions.pop(session.session_id, None)
+
+    def evictIdle(self, now=None):
+        """
+        Closes the sessions not used for idle_timeout seconds. The sessions are ordered by
+        last use, so only the evicted ones are looked at.
+
+        Returns:
+            int: The number of sessions evicted.
+        """
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_seen > deadline:
+                break
+            self.closeSession(session)
+            evicted += 1
+        return evicted
+
+    def handleRequest(self, request):
+        """
+        Runs one request on its session.
+
+        Returns:
+            dict: The answer, with "ok" false and an "error" when the request can't be run.
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "the request must be a JSON object"}
+        operation = request.get("op")
+        if operation == "open":
+            return {"ok": True, "session": self.openSession().session_id}
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            return {"ok": False, "error": "unknown or expired session"}
+        session.last_seen = time.monotonic()
+        self.sessions.move_to_end(session.session_id)
+        cart = session.cart
+        answer = {"ok": True, "session": session.session_id}
+        output = io.StringIO()
+        with redirect_stdout(output): #the client gets the messages the cart prints
+            if operation in ("add", "remove"):
+                name, quantity = request.get("name"), request.get("quantity")
+                if (not isinstance(name, str) or not isinstance(quantity, int) or isinstance(quantity, bool)
+                        or quantity <= 0): #a negative remove would create stock
+                    return {"ok": False, "session": session.session_id, "error": "Invalid item or quantity"}
+                if operation == "add":
+                    cart.addProduct(name, quantity)
+                else:
+                    cart.removeProduct(name, quantity)
+            elif operation == "checkout":
+                answer["total"] = cart.checkout()
+                cart = session.cart = Cart(self.engine, journal=self.journal, cart_id=session.session_id) #start a new cart
+            elif operation == "close":
+                self.closeSession(session)
+                return answer
+            elif operation != "cart":
+                return {"ok": False, "session": session.session_id, "error": f"unknown operation {operation!r}"}
+        answer["messages"] = output.getvalue().splitlines()
+        answer["cart"] = [[article.getName(), article.getQuantity(), article.getPrice()] for article in cart.articles.values()]
+        return answer
+
+    async def handleClient(self, reader, writer):
+        """Answers the JSON lines of one connection until the client disconnects"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    answer = self.handleRequest(json.loads(line))
+                except ValueError:
+                    answer = {"ok": False, "error": "the request is not valid JSON"}
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError): #dropped connection or oversized line
+            pass
+        finally:
+            writer.close()
+
+    async def _evictLoop(self):
+        """Evicts idle sessions and expired reservations periodically"""
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.01))
+            self.evictIdle()
+            self.engine.expire()
+
+    async def _syncLoop(self):
+        """Fsyncs the journal records of the last fsync interval, a batch of requests at a time"""
+        while True:
+            await asyncio.sleep(self.journal.fsync_interval)
+            self.journal.sync()
+
+    def releaseRecoveredCarts(self):
+        """Gives back the stock held by the carts of a previous run found in the journal"""
+        inventory = self.engine._inventory()
+        for cart_id, lines in list(self.journal.carts.items()):
+            with self.journal.atomic():
+                for name, quantity in lines.items():
+                    if name in inventory:
+                        inventory.adjustStock(name, quantity)
+                self.journal.record({"op": "close", "cart": cart_id})
+
+    async def start(self):
+        """Starts listening and evicting, returns the asyncio server"""
+        if self.journal is not None:
+            self.releaseRecoveredCarts()
+        server = await asyncio.start_server(self.handleClient, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1] #the real port when 0 was given
+        self._evictor = asyncio.create_task(self._evictLoop())
+        if self.journal is not None:
+            self._syncer = asyncio.create_task(self._syncLoop())
+        return server
+
+    async def run(self):
+        """Serves the carts until interrupted"""
+        server = await self.start()
+        print(f"Serving carts on {self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._evictor.cancel()
+            if self._syncer is not None:
+                self._syncer.cancel()
+
+def iter_orders(file_path):
+    """
+    Streams the operations of an orders file, as (order id, operation, product name,
+    quantity) tuples. JSON lines files (.jsonl, .json) hold objects with order_id, sku,
+    quantity and operation keys, other files are CSV with a header row of the same names.
+    The operation is add, remove or checkout (whose quantity and sku may be empty). A
+    malformed line yields None so it can be counted.
+    """
+    with open(file_path, "r", newline="") as file:
+        if file_path.endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = csv.DictReader(file)
+        while True:
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            except ValueError: #a broken JSON line, the generator can't go on after it
+                yield None
+                rows = (json.loads(line) for line in file if line.strip())
+                continue
+            try:
+                operation = row["operation"].strip().lower()
+                quantity = int(row.get("quantity") or 0)
+                yield str(row["order_id"]), operation, row.get("sku") or "", quantity
+            except (KeyError, AttributeError, TypeError, ValueError):
+                yield None
+
+def replay_orders(file_path, output_path=None, batch_size=REPLAY_BATCH_SIZE, pricing=None):
+    """
+    Replays an orders file with the rules of Cart: an add is capped by the stock
+    available, a remove gives back at most what the order holds, and a checkout prices the
+    order (with pricing, PRICING by default) and writes "order_id,total" to output_path as
+    it goes. Orders never checked out give their stock back at the end.
+
+    Every product is read from the inventory once, the replay then keeps its availability
+    itself, so the inventory shouldn't be changed by anything else meanwhile. The stock
+    changes are not written one by one: they are summed per product and applied with
+    adjustStockBatch every batch_size operations (one transaction for SQLite).
+
+    Returns:
+        dict: The counts of operations, orders checked out (priced), abandoned orders still holding stock and invalid lines, the seconds and the orders per second.
+    """
+    pricing = PRICING if pricing is None else pricing
+    orders = {} #open order id -> {product name: quantity}
+    pending = {} #product name -> stock change not yet applied to the inventory
+    prices = {} #product name -> price in cents, read once
+    available = {} #product name -> stock left, read once
+    counts = {"operations": 0, "checkouts": 0, "abandoned": 0, "invalid": 0}
+
+    def flush():
+        """Applies the pending stock changes in one batch"""
+        if pending:
+            INVENTORY.adjustStockBatch(pending)
+            pending.clear()
+
+    output = open(output_path, "w") if output_path else None
+    start = time.perf_counter()
+    try:
+        if output is not None:
+            output.write("order_id,total\n")
+        for entry in iter_orders(file_path):
+            if entry is None:
+                counts["invalid"] += 1
+                continue
+            order_id, operation, name, quantity = entry
+            if operation == "checkout":
+                lines = orders.pop(order_id, None)
+                if lines:
+                    total_cents = pricing.priceCart((item, count, prices[item]) for item, count in lines.items())
+                    if output is not None:
+                        output.write(f"{order_id},{format_cents(total_cents)}\n")
+                    counts["checkouts"] += 1 #checkouts of unknown or empty orders price nothing
+            elif operation in ("add", "remove") and quantity >= 0 and (name in prices or name in INVENTORY):
+                lines = orders.setdefault(order_id, {})
+                if name not in prices:
+                    stock_quantity, price = INVENTORY[name]
+                    prices[name] = to_cents(price)
+                    available[name] = stock_quantity
+                if operation == "add":
+                    quantity = min(quantity, available[name]) #what is left
+                    change = -quantity
+                else:
+                    quantity = min(quantity, lines.get(name, 0)) #what the order holds
+                    change = quantity
+                if quantity:
+                    lines[name] = lines.get(name, 0) - change
+                    if not lines[name]:
+                        del lines[name]
+                    pending[name] = pending.get(name, 0) + change
+                    available[name] += change
+            else:
+                counts["invalid"] += 1
+                continue
+            counts["operations"] += 1
+            if counts["operations"] % batch_size == 0:
+                flush()
+        for order_id, lines in orders.items(): #abandoned orders give their stock back
+            for name, quantity in lines.items():
+                pending[name] = pending.get(name, 0) + quantity
+            if lines: #orders emptied by their removes held nothing
+                counts["abandoned"] += 1
+        flush()
+    finally:
+        if output is not None:
+            output.close()
+    counts["seconds"] = time.perf_counter() - start
+    counts["orders_per_second"] = counts["checkouts"] / counts["seconds"] if counts["seconds"] else 0.0
+    return counts
+
+def parse_arguments(argv):
+    """Parses the command line options"""
+    parser = argparse.ArgumentParser(description="Shopping cart CLI.")
+    parser.add_argument("--products", default="products.csv", help="csv file of the products (name, quantity, price)")
+    parser.add_argument("--db", help="keep the inventory in this SQLite database, "
+                                     "the products file is imported only when the database is empty")
+    parser.add_argument("--load-report", help="write the rejected rows of the products file to this csv file")
+    parser.add_argument("--load-workers", type=int, help="processes parsing large products files (all cores by default)")
+    parser.add_argument("--compact", action="store_true", help="keep the inventory in compact arrays (large catalogues in memory)")
+    parser.add_argument("--journal", help="journal every change in this directory and recover from it at start, "
+                                          "the products file is only read when there is nothing to recover "
+                                          "(not with --db, the database already commits every change)")
+    parser.add_argument("--replay", help="replay this orders file (CSV or JSON lines) instead of the interactive menu")
+    parser.add_argument("--replay-output", help="write the total of every replayed order to this CSV file")
+    parser.add_argument("--serve", action="store_true", help="host the carts in a TCP server speaking JSON lines "
+                                                            "instead of the interactive menu")
+    parser.add_argument("--host", default=SERVER_HOST, help="address the server listens on")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="port the server listens on")
+    parser.add_argument("--idle-timeout", type=float, default=SESSION_IDLE_TIMEOUT,
+                        help="seconds before an idle server session is evicted and its stock released")
+    options = parser.parse_args(argv)
+    if options.journal and options.db: #the database is durable by itself, a journal would only slow its start
+        parser.error("--journal can't be used with --db, the database already commits every change")
+    return options
+
+def main(argv=None):
     """
     The main function takes a file path to the csv file, then it creates an object for
     the cart. Then function read_data reads file content and saves it in the inventory
     then the program keeps looping and asking the user about the intended operation or
     act to perform on the cart.
+
+    With --db the inventory lives in a SQLite database instead, which starts instantly
+    for large catalogues and keeps the stock changes after the program ends. With --serve
+    the carts are served over TCP by a ShoppingServer. With --journal the changes are
+    journaled and a previous session, crashed or not, is recovered with its cart.
+
+    The products file is validated while it is read, the rejected rows are reported. A
+    large file loads in the background in the interactive menu, which starts at once.
     """
-    file_path = "products.csv" #take file path
-    crt = Cart() #create cart object
-    read_data(file_path) #read and save file data in the inventory
+    options = parse_arguments(argv)
+    file_path = options.products #take file path
+    journal = InventoryJournal(options.journal) if options.journal else None
+    if options.db:
+        set_inventory(SQLiteInventory(options.db))
+        if INVENTORY.isEmpty(): #first start, import the catalogue once
+            load_products(file_path, options.load_workers, options.load_report)
+    else:
+        if options.compact:
+            set_inventory(ArrayInventory())
+        if journal and journal.exists():
+            pass #recovered below
+        elif (journal is None and not options.serve and not options.replay
+                and os.path.getsize(file_path) >= BACKGROUND_LOAD_THRESHOLD): #the menu starts while it loads
+            load_in_background(file_path, options.load_workers, options.load_report)
+        else:
+            load_products(file_path, options.load_workers, options.load_report) #read and save file data in the inventory
+    if journal is not None:
+        if journal.exists():
+            replayed = journal.recover(INVENTORY)
+            print(f"Recovered the inventory ({replayed} journal records replayed)")
+        else:
+            journal.snapshot(INVENTORY) #the starting point of the journal
+        set_inventory(JournaledInventory(INVENTORY, journal))
+    crt = Cart(journal=journal) #create cart object
+    if journal is not None:
+        crt.restoreLines(journal.carts.get(crt.cart_id, {}))
+    try:
+        if options.replay:
+            counts = replay_orders(options.replay, options.replay_output)
+            print(f"Replayed {counts['operations']} operations, {counts['checkouts']} orders checked out "
+                  f"in {counts['seconds']:.2f}s ({counts['orders_per_second']:,.0f} orders/s), "
+                  f"{counts['abandoned']} abandoned, {counts['invalid']} invalid lines")
+            return
+        if options.serve:
+            try:
+                asyncio.run(ShoppingServer(options.host, options.port, options.idle_timeout, journal=journal).run())
+            except KeyboardInterrupt:
+                print("Server stopped")
+            return
+        shop(crt, file_path, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+
+def shop(crt, file_path, journal=None):
+    """Runs the interactive menu on the cart, syncing the journal after every operation"""
     while True: #keep looping
         menu() #display menu
         print("")
@@ -259,6 +2120,8 @@ def main():
         print("")
         choice = check_choice(customer_choice) #get customer choice
         keep_operation = perform_operation(crt, choice, file_path) #perform the operatio and update operation activity status
+        if journal is not None: #the operation is durable before the user is asked anything else
+            journal.sync()
         if keep_operation == False: #if option 6 then exit program
             print("Thanks for shopping with us, return soon!")
             break
@@ -0,0 +1,619 @@
+"""
+Contributers: InterWorldKid
+
+This module benchmarks, stress and load tests the Shopping Cart program (Shopping_Cart.py).
+
+The cart mode (the default) measures the cart operations as catalogues and carts grow. It
+generates a synthetic catalogue, then customers fill carts with products picked uniformly
+or with a Zipf-skewed popularity (a few products are bought most of the time), remove
+some, display and check out their carts through the menu (perform_operation) with the
+input prompts stubbed. For every operation the operations per second and the p50/p90/p99
+latency are reported, with the peak memory (tracemalloc, measured in a second run). The results can be
+saved as a baseline and later runs compared with it.
+
+The stress mode checks the reservation engine. Hundreds of threads, each with its own cart,
+add, remove and check out a few scarce products at the same time through one
+ReservationEngine, some carts being abandoned so their reservations expire back into the
+inventory. At the end the stock is audited:
+
+1- no product went below zero
+2- stock left + quantity sold + quantity still reserved equals the initial stock (no oversell)
+
+The stress mode then races expire() against commit() on the same reservation many times,
+with stock changes slowed down so the commit runs while the release is under way, and
+checks that the units are either committed or back in stock, never both.
+
+The operations per second and the audit are printed, and the exit status is 1 if the audit fails.
+
+The load mode is a load generator for the server mode (ShoppingServer). Many asyncio clients,
+each with its own session and connection, send add, remove and checkout requests, and the
+requests per second and the p50/p99 latency of every operation are reported. Without --server
+a server is started in this process (in a thread, so it shares the interpreter with the
+clients); pass --server to measure a separately started "Shopping_Cart.py --serve".
+
+The pricing mode generates historical carts and reprices them in one batch with the
+PricingEngine, reporting carts per minute.
+
+The memory mode builds the same catalogue as a MemoryInventory and as an ArrayInventory and
+reports the bytes per product (not counting the name strings, shared by both) and the speed
+of random stock updates.
+
+Every mode can write its results to a JSON file (--json) for tracking over time.
+
+Example:
+    python Shopping_Cart_Benchmark.py --catalogues 1000,100000 --cart-sizes 5,50 --save-baseline baseline.json
+    python Shopping_Cart_Benchmark.py --catalogues 1000,100000 --cart-sizes 5,50 --baseline baseline.json
+    python Shopping_Cart_Benchmark.py --mode stress --threads 500 --operations 200 --products 20 --stock 50
+    python Shopping_Cart_Benchmark.py --mode stress --db /tmp/stress.db
+    python Shopping_Cart_Benchmark.py --mode load --clients 500 --operations 100
+    python Shopping_Cart_Benchmark.py --mode load --server 127.0.0.1:8765
+    python Shopping_Cart_Benchmark.py --mode pricing --carts 1000000
+    python Shopping_Cart_Benchmark.py --mode memory --skus 10000000
+
+"""
+
+
+import argparse #import argparse to parse the benchmark options
+import asyncio #import asyncio for the load generator clients
+import builtins #import builtins to stub the input prompts
+import itertools #import itertools to accumulate the Zipf weights
+import json #import json for the server protocol
+import os #import os to reach the null device and remove the database
+import random #import random to pick the operations
+import sys #import sys to return the exit status and shorten the thread switch interval
+import threading #import threading to run the carts concurrently
+import time #import time to measure the run
+import tracemalloc #import tracemalloc to measure the inventory memory
+from contextlib import contextmanager, redirect_stdout #import helpers to stub prompts and silence the cart messages
+
+import Shopping_Cart #the module being tested
+
+DEFAULT_THREADS = 300 #concurrent carts
+DEFAULT_OPERATIONS = 100 #operations per cart
+DEFAULT_PRODUCTS = 10 #few products so the carts fight over them
+DEFAULT_STOCK = 40 #initial quantity of every product
+DEFAULT_TTL = 0.05 #seconds before an abandoned cart's reservations expire
+SWITCH_INTERVAL = 1e-6 #switch threads as often as possible to provoke races
+DEFAULT_RACES = 200 #reservations expired while their cart checks out, in the stress mode
+RACE_PAUSE = 0.0005 #seconds a stock change lasts in the race, so the other thread runs in the middle of it
+DEFAULT_CLIENTS = 200 #concurrent server sessions of the load mode, more may need a higher open files limit
+LOAD_OPERATIONS = ("add", "remove", "checkout") #operations whose latency is reported
+DEFAULT_CARTS = 200000 #carts repriced by the pricing mode
+DEFAULT_SKUS = 1000000 #products of the memory mode, 10M needs a few GB for the dictionary backend
+STOCK_UPDATES = 1000000 #random stock updates timed by the memory mode
+DEFAULT_CATALOGUES = "1000,100000" #catalogue sizes of the cart mode
+DEFAULT_CART_SIZES = "5,50" #products added per cart in the cart mode
+DEFAULT_DISTRIBUTIONS = "uniform,zipf" #product popularity of the cart mode
+DEFAULT_CUSTOMERS = 200 #carts filled and checked out per case of the cart mode
+ZIPF_EXPONENT = 1.1 #skew of the Zipf popularity, the product of rank r is picked with weight 1/r**s
+CART_OPERATIONS = ("add", "remove", "display", "checkout") #operations measured by the cart mode
+REGRESSION_TOLERANCE = 0.2 #an operation is reported as a regression when 20% slower than its baseline
+
+def build_inventory(products, stock, db_path=None):
+    """Creates the inventory backend filled with products of the given stock"""
+    if db_path:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        inventory = Shopping_Cart.SQLiteInventory(db_path)
+    else:
+        inventory = Shopping_Cart.MemoryInventory()
+    for index in range(products):
+        inventory[f"product{index}"] = (stock, 1.0 + index)
+    return inventory
+
+@contextmanager
+def stub_input(replies):
+    """Replaces input() with a function taking the answers from the end of the replies list"""
+    original_input = builtins.input
+    builtins.input = lambda prompt="": replies.pop()
+    try:
+        yield
+    finally:
+        builtins.input = original_input
+
+def product_picker(names, distribution, generator):
+    """Returns a function picking a product name uniformly or with Zipf-skewed popularity"""
+    if distribution == "uniform":
+        return lambda: names[generator.randrange(len(names))]
+    cumulative = list(itertools.accumulate(1 / rank ** ZIPF_EXPONENT for rank in range(1, len(names) + 1)))
+    return lambda: generator.choices(names, cum_weights=cumulative)[0]
+
+def cart_workload(catalogue, cart_size, distribution, customers, seed=0):
+    """
+    Fills, trims, displays and checks out customers carts of cart_size products picked
+    from a new catalogue of catalogue products, every operation going through
+    perform_operation with the prompts stubbed and timed on its own.
+
+    Returns:
+        dict: The operation name mapped to the list of its latencies in seconds.
+    """
+    generator = random.Random(seed)
+    inventory = build_inventory(catalogue, 10 ** 9) #enough stock that no add is capped
+    Shopping_Cart.set_inventory(inventory)
+    pick = product_picker(list(inventory), distribution, generator)
+    latencies = {operation: [] for operation in CART_OPERATIONS}
+    replies = [] #answers of the next operation, in reverse order
+    perform_operation = Shopping_Cart.perform_operation
+
+    def timed(operation, choice, crt, answers=()):
+        """Runs one menu operation with its answers and records its latency"""
+        replies[:] = reversed(answers)
+        start = time.perf_counter()
+        perform_operation(crt, choice, None)
+        latencies[operation].append(time.perf_counter() - start)
+
+    with open(os.devnull, "w") as null_device, redirect_stdout(null_device), stub_input(replies):
+        for customer in range(customers):
+            crt = Shopping_Cart.Cart()
+            names = [pick() for item in range(cart_size)]
+            for name in names:
+                timed("add", "3", crt, (name, str(generator.randint(1, 5))))
+            for name in names[:max(1, cart_size // 3)]: #a third of the products are taken out again
+                timed("remove", "4", crt, (name, str(generator.randint(1, 3))))
+            timed("display", "2", crt)
+            timed("checkout", "5", crt)
+    return latencies
+
+def run_cart_case(catalogue, cart_size, distribution, customers, track_memory, seed=0):
+    """
+    Times the cart workload, then runs it again under tracemalloc for its peak memory
+    (tracing slows every allocation down, so it would distort the latencies).
+
+    Returns:
+        dict: Per operation the count, operations per second and p50/p90/p99 latency in seconds, and the peak memory.
+    """
+    latencies = cart_workload(catalogue, cart_size, distribution, customers, seed)
+    results = {}
+    for operation, values in latencies.items():
+        values.sort()
+        total = sum(values)
+        results[operation] = {"count": len(values), "ops_per_second": len(values) / total if total else None,
+                              "p50": percentile(values, 0.5), "p90": percentile(values, 0.9),
+                              "p99": percentile(values, 0.99)}
+    results["peak_memory"] = None
+    if track_memory:
+        tracemalloc.start()
+        cart_workload(catalogue, cart_size, distribution, customers, seed)
+        results["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return results
+
+def run_cart_benchmarks(catalogues, cart_sizes, distributions, customers, track_memory, seed=0):
+    """
+    Runs every combination of catalogue size, cart size and popularity distribution.
+
+    Returns:
+        dict: Results keyed by "<distribution>-<catalogue>x<cart size>", then by operation.
+    """
+    results = {}
+    for distribution in distributions:
+        for catalogue in catalogues:
+            for cart_size in cart_sizes:
+                results[f"{distribution}-{catalogue}x{cart_size}"] = run_cart_case(
+                    catalogue, cart_size, distribution, customers, track_memory, seed)
+    return results
+
+def compare_with_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compares the throughput of every operation with the baseline.
+
+    Returns:
+        list of str: A message for every operation slower than the baseline by more than tolerance.
+    """
+    regressions = []
+    for case, operations in results.items():
+        for operation in CART_OPERATIONS:
+            numbers = operations.get(operation)
+            previous = baseline.get(case, {}).get(operation)
+            if not numbers or not previous or not previous["ops_per_second"] or not numbers["ops_per_second"]:
+                continue #not measured in the baseline
+            ratio = numbers["ops_per_second"] / previous["ops_per_second"]
+            if ratio < 1 - tolerance:
+                regressions.append(f"{case} {operation}: {ratio:.0%} of the baseline throughput")
+    return regressions
+
+def print_cart_results(results):
+    """Displays one line per case and operation"""
+    print(f"{'case':<22}{'operation':<11}{'ops/s':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'peak MB':>10}")
+    for case, operations in results.items():
+        peak = "" if operations["peak_memory"] is None else f"{operations['peak_memory'] / 1e6:.1f}"
+        for operation in CART_OPERATIONS:
+            numbers = operations[operation]
+            if not numbers["count"]:
+                continue
+            print(f"{case:<22}{operation:<11}{numbers['ops_per_second']:>12,.0f}{numbers['p50'] * 1e6:>10.1f}"
+                  f"{numbers['p90'] * 1e6:>10.1f}{numbers['p99'] * 1e6:>10.1f}{peak:>10}")
+
+def shopper(engine, names, operations, seed, sold, barrier):
+    """
+    Runs one cart: random adds and removes, then a checkout or, one time in four, an
+    abandoned cart left to expire. The quantities checked out are added to sold.
+    """
+    generator = random.Random(seed)
+    cart = Shopping_Cart.Cart(engine)
+    barrier.wait() #every cart starts at the same time
+    for operation in range(operations):
+        name = generator.choice(names)
+        if generator.random() < 0.7:
+            cart.addProduct(name, generator.randint(1, 5))
+        else:
+            cart.removeProduct(name, generator.randint(1, 3))
+    if generator.random() < 0.25:
+        return #abandoned, the reservations expire
+    cart.checkout()
+    with sold["lock"]:
+        for name, article in cart.articles.items():
+            sold[name] = sold.get(name, 0) + article.getQuantity()
+
+def audit(inventory, engine, stock, sold):
+    """
+    Checks the stock after the run.
+
+    Returns:
+        list of str: A message for every product that went negative or whose stock doesn't add up.
+    """
+    problems = []
+    reserved = {}
+    with engine._registry_lock:
+        for reservation in engine._reservations.values():
+            reserved[reservation.name] = reserved.get(reservation.name, 0) + reservation.quantity
+    for name in inventory:
+        left = inventory[name][0]
+        if left < 0:
+            problems.append(f"{name}: negative stock {left}")
+        total = left + sold.get(name, 0) + reserved.get(name, 0)
+        if total != stock:
+            problems.append(f"{name}: {left} left + {sold.get(name, 0)} sold + {reserved.get(name, 0)} reserved != {stock}")
+    return problems
+
+class SlowInventory(Shopping_Cart.MemoryInventory):
+    """MemoryInventory whose stock changes pause, leaving other threads time to run in the middle of a release"""
+
+    def __init__(self, *args, **kwargs):
+        """Creates the inventory, with the event set when a stock change starts"""
+        super().__init__(*args, **kwargs)
+        self.changing = threading.Event()
+
+    def adjustStock(self, name, change):
+        """Changes the stock, then pauses before returning"""
+        changed = super().adjustStock(name, change)
+        self.changing.set()
+        time.sleep(RACE_PAUSE)
+        return changed
+
+def run_expiry_race(rounds, stock=10, quantity=4):
+    """
+    Expires a reservation in one thread while another commits it, rounds times. The commit
+    starts once the release is changing the stock.
+
+    Returns:
+        list of str: A message for every round where the units were both committed and put back.
+    """
+    problems = []
+    for round_number in range(rounds):
+        inventory = SlowInventory(product=(stock, 1.0))
+        engine = Shopping_Cart.ReservationEngine(inventory, ttl=60)
+        reservation = engine.reserve("product", quantity)
+        inventory.changing.clear()
+        committed = []
+
+        def expire():
+            """Expires every reservation, as the reaper does once their time is up"""
+            engine.expire(now=float("inf"))
+
+        def commit():
+            """Checks the reservation out while the release puts its stock back"""
+            inventory.changing.wait(1)
+            committed.append(engine.commit(reservation))
+
+        workers = [threading.Thread(target=expire), threading.Thread(target=commit)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        left = inventory["product"][0]
+        if left + committed[0] + engine.reservedQuantity() != stock:
+            problems.append(f"race {round_number}: {left} left + {committed[0]} committed + "
+                            f"{engine.reservedQuantity()} reserved != {stock}")
+    return problems
+
+def run_stress(threads, operations, products, stock, ttl, db_path=None, seed=0, races=DEFAULT_RACES):
+    """
+    Runs the carts concurrently and audits the inventory.
+
+    Returns:
+        dict: The elapsed seconds, operations per second, quantity sold, reservations expired and audit problems.
+    """
+    inventory = build_inventory(products, stock, db_path)
+    Shopping_Cart.set_inventory(inventory) #the carts look products up in the global inventory
+    engine = Shopping_Cart.ReservationEngine(inventory, ttl=ttl)
+    names = list(inventory)
+    sold = {"lock": threading.Lock()}
+    barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=shopper, args=(engine, names, operations, seed + index, sold, barrier))
+               for index in range(threads)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(SWITCH_INTERVAL)
+    try:
+        with open(os.devnull, "w") as null_device, redirect_stdout(null_device):
+            for worker in workers:
+                worker.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+    finally:
+        sys.setswitchinterval(switch_interval)
+    del sold["lock"]
+    reserved_before = engine.reservedQuantity()
+    time.sleep(ttl)
+    expired = engine.expire() #the abandoned carts give their stock back
+    problems = audit(inventory, engine, stock, sold)
+    if engine.reservedQuantity() != 0:
+        problems.append(f"{engine.reservedQuantity()} still reserved after every reservation expired")
+    if isinstance(inventory, Shopping_Cart.SQLiteInventory):
+        inventory.close()
+    problems += run_expiry_race(races)
+    return {"seconds": elapsed, "operations_per_second": threads * operations / elapsed,
+            "sold": sum(sold.values()), "reserved_at_end": reserved_before, "expired": expired,
+            "races": races, "problems": problems}
+
+def percentile(sorted_values, fraction):
+    """Returns the value below which fraction of the sorted values fall (nearest rank)"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+async def load_client(host, port, names, operations, seed, latencies):
+    """
+    Opens one session and sends operations requests: 60% adds, 30% removes and 10%
+    checkouts. The latency of every request is appended to latencies[operation].
+    """
+    generator = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        """Sends one request and waits for its answer"""
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        answer = json.loads(await reader.readline())
+        latencies.setdefault(request["op"], []).append(time.perf_counter() - start)
+        return answer
+
+    session = (await call({"op": "open"}))["session"]
+    for operation in range(operations):
+        draw = generator.random()
+        if draw < 0.6:
+            await call({"op": "add", "session": session, "name": generator.choice(names), "quantity": generator.randint(1, 5)})
+        elif draw < 0.9:
+            await call({"op": "remove", "session": session, "name": generator.choice(names), "quantity": generator.randint(1, 3)})
+        else:
+            await call({"op": "checkout", "session": session})
+    await call({"op": "close", "session": session})
+    writer.close()
+
+def start_local_server(inventory):
+    """
+    Starts a ShoppingServer on a free port in a background thread.
+
+    Returns:
+        tuple: The ShoppingServer, and a function stopping it.
+    """
+    shopping_server = Shopping_Cart.ShoppingServer(port=0, inventory=inventory)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(shopping_server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        """Closes the server and its loop"""
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        shopping_server._evictor.cancel()
+        loop.run_until_complete(asyncio.gather(shopping_server._evictor, return_exceptions=True))
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+    return shopping_server, stop
+
+def run_load(clients, operations, products, stock, server_address=None, seed=0):
+    """
+    Runs the load generator against a server (a local one when server_address is None).
+
+    Returns:
+        dict: The elapsed seconds, requests per second and, per operation, the count and p50/p99 latency in seconds.
+    """
+    stop = None
+    if server_address:
+        host, port = server_address.rsplit(":", 1)
+        port = int(port)
+        names = [f"product{index}" for index in range(products)] #the products the benchmark inventory would hold
+    else:
+        inventory = build_inventory(products, stock)
+        Shopping_Cart.set_inventory(inventory)
+        shopping_server, stop = start_local_server(inventory)
+        host, port = shopping_server.host, shopping_server.port
+        names = list(inventory)
+    latencies = {}
+
+    async def run_clients():
+        """Runs every client concurrently"""
+        await asyncio.gather(*(load_client(host, port, names, operations, seed + index, latencies)
+                               for index in range(clients)))
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(run_clients())
+    finally:
+        elapsed = time.perf_counter() - start
+        if stop is not None:
+            stop()
+    results = {"seconds": elapsed, "requests_per_second": sum(map(len, latencies.values())) / elapsed}
+    for operation in LOAD_OPERATIONS:
+        values = sorted(latencies.get(operation, []))
+        results[operation] = {"count": len(values), "p50": percentile(values, 0.5), "p99": percentile(values, 0.99)}
+    return results
+
+def run_pricing(carts, products, seed=0):
+    """
+    Reprices carts random carts of 1 to 8 lines in one batch.
+
+    Returns:
+        dict: The elapsed seconds, carts per minute and the total of all the carts in cents.
+    """
+    generator = random.Random(seed)
+    names = [f"product{index}" for index in range(products)]
+    prices = [Shopping_Cart.to_cents(1.0 + index) for index in range(products)]
+    batch = []
+    for cart in range(carts):
+        lines = []
+        for line in range(generator.randint(1, 8)):
+            index = generator.randrange(products)
+            lines.append((names[index], generator.randint(1, 6), prices[index]))
+        batch.append(lines)
+    start = time.perf_counter()
+    totals = Shopping_Cart.PRICING.priceBatch(batch)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "carts_per_minute": carts / elapsed * 60, "total_cents": sum(totals)}
+
+def measure_inventory(backend_class, names, seed=0):
+    """
+    Builds an inventory of the given products and applies random stock updates.
+
+    Returns:
+        dict: The bytes per product and the updates per second.
+    """
+    tracemalloc.start()
+    inventory = backend_class()
+    for index, name in enumerate(names):
+        inventory[name] = (1000 + index % 5000, 1.0 + index % 9973 / 100) #realistic, not cached small values
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    generator = random.Random(seed)
+    picks = [names[generator.randrange(len(names))] for update in range(STOCK_UPDATES)]
+    start = time.perf_counter()
+    for name in picks:
+        inventory.adjustStock(name, 1)
+    elapsed = time.perf_counter() - start
+    return {"bytes_per_product": size / len(names), "updates_per_second": STOCK_UPDATES / elapsed}
+
+def run_memory(skus):
+    """
+    Compares the dictionary and the array inventories on the same products.
+
+    Returns:
+        dict: The measures of measure_inventory for both backends.
+    """
+    names = [f"sku{index:08d}" for index in range(skus)] #created once, not counted
+    results = {}
+    for backend_class in (Shopping_Cart.MemoryInventory, Shopping_Cart.ArrayInventory):
+        results[backend_class.__name__] = measure_inventory(backend_class, names)
+    return results
+
+def parse_arguments(argv):
+    """Parses the benchmark options"""
+    parser = argparse.ArgumentParser(description="Benchmark, stress and load test the Shopping Cart.")
+    parser.add_argument("--mode", choices=["cart", "stress", "load", "pricing", "memory"], default="cart",
+                        help="cart operations, threaded stress test, server load test, batch repricing or inventory memory")
+    parser.add_argument("--catalogues", default=DEFAULT_CATALOGUES, help="comma separated catalogue sizes (cart mode)")
+    parser.add_argument("--cart-sizes", default=DEFAULT_CART_SIZES, help="comma separated products per cart (cart mode)")
+    parser.add_argument("--distributions", default=DEFAULT_DISTRIBUTIONS, help="comma separated popularities: uniform, zipf (cart mode)")
+    parser.add_argument("--customers", type=int, default=DEFAULT_CUSTOMERS, help="carts per case (cart mode)")
+    parser.add_argument("--no-memory", dest="track_memory", action="store_false",
+                        help="don't measure the peak memory (saves the second, traced run of every case)")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="number of concurrent carts")
+    parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS, help="operations per cart or client")
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS, help="number of products")
+    parser.add_argument("--stock", type=int, default=DEFAULT_STOCK, help="initial quantity of every product")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="reservation time to live in seconds")
+    parser.add_argument("--db", help="run against a SQLite inventory in this file instead of memory")
+    parser.add_argument("--races", type=int, default=DEFAULT_RACES,
+                        help="reservations expired while their cart checks out (stress mode)")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="concurrent server sessions (load mode)")
+    parser.add_argument("--server", help="HOST:PORT of a running server to load test, a local one is started otherwise")
+    parser.add_argument("--carts", type=int, default=DEFAULT_CARTS, help="carts repriced (pricing mode)")
+    parser.add_argument("--skus", type=int, default=DEFAULT_SKUS, help="products of the memory mode")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", help="save the cart mode results as the baseline in this JSON file")
+    parser.add_argument("--baseline", help="compare the cart mode results with the baseline in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="allowed slowdown before a regression is reported")
+    return parser.parse_args(argv)
+
+def run_mode(options):
+    """
+    Runs the benchmark of the chosen mode and prints its results.
+
+    Returns:
+        tuple: The results and the exit status (1 if the stress audit or the baseline comparison failed).
+    """
+    if options.mode == "cart":
+        results = run_cart_benchmarks([int(size) for size in options.catalogues.split(",")],
+                                      [int(size) for size in options.cart_sizes.split(",")],
+                                      options.distributions.split(","), options.customers,
+                                      options.track_memory, options.seed)
+        print_cart_results(results)
+        if options.save_baseline:
+            with open(options.save_baseline, "w") as file:
+                json.dump(results, file, indent=2)
+        if options.baseline:
+            with open(options.baseline, "r") as file:
+                regressions = compare_with_baseline(results, json.load(file), options.tolerance)
+            for regression in regressions:
+                print(f"Regression: {regression}")
+            if regressions:
+                return results, 1
+            print("No regression against the baseline.")
+        return results, 0
+    if options.mode == "memory":
+        results = run_memory(options.skus)
+        print(f"{'backend':<18}{'bytes/product':>15}{'updates/s':>14}")
+        for backend, numbers in results.items():
+            print(f"{backend:<18}{numbers['bytes_per_product']:>15.1f}{numbers['updates_per_second']:>14,.0f}")
+        return results, 0
+    if options.mode == "pricing":
+        results = run_pricing(options.carts, options.products, options.seed)
+        print(f"Repriced {options.carts} carts in {results['seconds']:.2f}s ({results['carts_per_minute']:,.0f} carts/minute)")
+        return results, 0
+    if options.mode == "load":
+        results = run_load(options.clients, options.operations, options.products, options.stock,
+                           options.server, options.seed)
+        print(f"{options.clients} clients x {options.operations} requests in {results['seconds']:.2f}s "
+              f"({results['requests_per_second']:,.0f} requests/s)")
+        print(f"{'operation':<12}{'count':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for operation in LOAD_OPERATIONS:
+            numbers = results[operation]
+            if numbers["count"]:
+                print(f"{operation:<12}{numbers['count']:>10}{numbers['p50'] * 1000:>10.2f}{numbers['p99'] * 1000:>10.2f}")
+        return results, 0
+    results = run_stress(options.threads, options.operations, options.products, options.stock,
+                         options.ttl, options.db, options.seed, options.races)
+    print(f"{options.threads} carts x {options.operations} operations in {results['seconds']:.2f}s "
+          f"({results['operations_per_second']:,.0f} operations/s)")
+    print(f"Sold {results['sold']}, {results['reserved_at_end']} reserved by abandoned carts, "
+          f"{results['expired']} reservations expired, {results['races']} expiries raced with a checkout")
+    for problem in results["problems"]:
+        print(f"Oversell: {problem}")
+    if results["problems"]:
+        return results, 1
+    print("No oversell, the stock adds up.")
+    return results, 0
+
+def main(argv=None):
+    """
+    Runs the chosen benchmark, prints its results and writes them to the JSON file if
+    asked. Returns 1 if the stress audit found an oversold product or the cart mode
+    found a regression against the baseline, 0 otherwise.
+    """
+    options = parse_arguments(argv)
+    results, status = run_mode(options)
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump({"mode": options.mode, "results": results}, file, indent=2)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
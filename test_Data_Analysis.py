@@ -0,0 +1,78 @@
+"""
+Contributers: InterWorldKid
+
+Tests of the Data Analysis CLI (Data_Analysis.py).
+
+Example:
+    python -m unittest test_Data_Analysis
+
+"""
+
+
+import os #import os to remove the generated files
+import random #import random to generate the test columns
+import tempfile #import tempfile to store the generated files
+import unittest #import unittest to run the tests
+
+import Data_Analysis #the module being tested
+
+class HistogramTest(unittest.TestCase):
+    """Tests of the histogram chart"""
+
+    def test_log_bins_count_every_value(self):
+        """The last log edge is the maximum, so no value falls past it and the counts add up"""
+        generator = random.Random(0)
+        for case in range(500):
+            values = [f"{generator.uniform(0.01, 1000):.3f}" for index in range(generator.randint(2, 50))]
+            edges, counts = Data_Analysis.compute_histogram(values, 10, "log")
+            self.assertEqual(sum(counts), len(values))
+            self.assertEqual(edges[-1], max(float(value) for value in values))
+
+class ParallelLoadTest(unittest.TestCase):
+    """Tests of the parallel column loader"""
+
+    def setUp(self):
+        """Writes a file whose quoted notes span several lines that look like rows"""
+        self.expected = []
+        file, self.file_path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(file, "w") as csv_file:
+            csv_file.write("value,note\n")
+            for row in range(2000):
+                self.expected.append(float(row))
+                note = "\n".join(f"{row + 0.5},part {line}" for line in range(4)) #lines of a single field
+                csv_file.write(f'{row},"{note}"\n')
+
+    def tearDown(self):
+        """Removes the generated file"""
+        os.remove(self.file_path)
+
+    def test_quoted_fields_spanning_lines(self):
+        """Fields spanning lines can't be cut by the ranges, the column is loaded like the sequential loader does"""
+        column = Data_Analysis.load_column(self.file_path, "value", workers=4)
+        self.assertEqual(list(column.values), self.expected)
+        self.assertTrue(all(column.valid))
+
+class IncrementalTest(unittest.TestCase):
+    """Tests of the incremental analysis"""
+
+    def test_rewritten_file_leaves_one_sorted_file(self):
+        """The sorted column of a file that was rewritten is deleted with its state"""
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "values.csv")
+            state_dir = os.path.join(directory, "state")
+            with open(file_path, "w") as csv_file:
+                csv_file.write("value\n1\n")
+            for value in (2, 3): #appends, each one makes a new sorted file
+                Data_Analysis.analyze_incremental(file_path, "value", state_dir)
+                with open(file_path, "a") as csv_file:
+                    csv_file.write(f"{value}\n")
+            with open(file_path, "w") as csv_file: #rewritten
+                csv_file.write("value\n9\n")
+            stats, sorted_values, rows = Data_Analysis.analyze_incremental(file_path, "value", state_dir)
+            self.assertEqual(list(sorted_values), [9.0])
+            del sorted_values #release the mapping before the directory is removed
+            sorted_files = [name for name in os.listdir(state_dir) if name.endswith(".sorted")]
+            self.assertEqual(len(sorted_files), 1)
+
+if __name__ == "__main__":
+    unittest.main()